@@ -7,7 +7,7 @@ from alembic import context
 
 # Import your models here
 from app.database import Base
-from app.models import User, RefreshToken, Genre, Movie, MovieGenre, Review, FavoriteMovie
+from app.models import User, RefreshToken, RevokedToken, Genre, Movie, MovieGenre, Review, FavoriteMovie
 from app.config import settings
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,18 @@
+"""Helpers shared by migrations (``alembic/`` is on sys.path, see alembic.ini)."""
+from alembic import op
+import sqlalchemy as sa
+
+
+def drop_index_if_invalid(index_name: str) -> None:
+    """Drop an index left INVALID by an interrupted concurrent build, so it is built again.
+
+    ``create_index(..., postgresql_concurrently=True, if_not_exists=True)``
+    would otherwise skip it, and an invalid index is neither used by queries
+    nor as an ON CONFLICT arbiter. Call it inside ``autocommit_block()``.
+    """
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND pg_catalog.pg_table_is_visible(c.oid)"
+    ), {"name": index_name}).scalar()
+    if invalid:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY "{index_name}"'))
@@ -0,0 +1,22 @@
+"""Add keyset pagination index on movies
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_movies_created_at_id', 'movies', ['created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movies_created_at_id', table_name='movies')
@@ -0,0 +1,52 @@
+"""Add rating aggregates to movies
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('movies', sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('movies', sa.Column('rating_sum', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column(
+        'movies',
+        sa.Column(
+            'rating_histogram',
+            postgresql.ARRAY(sa.Integer()),
+            nullable=False,
+            server_default='{0,0,0,0,0,0,0,0,0,0,0}',
+        ),
+    )
+
+    # Backfill aggregates for existing reviews
+    op.execute(
+        """
+        UPDATE movies m SET
+            rating_count = (SELECT count(*) FROM reviews r WHERE r.movie_id = m.id),
+            rating_sum = (SELECT coalesce(sum(r.rating), 0) FROM reviews r WHERE r.movie_id = m.id),
+            rating_histogram = ARRAY(
+                SELECT count(r.id)::integer
+                FROM generate_series(0, 10) AS g(rating)
+                LEFT JOIN reviews r ON r.movie_id = m.id AND r.rating = g.rating
+                GROUP BY g.rating
+                ORDER BY g.rating
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('movies', 'rating_histogram')
+    op.drop_column('movies', 'rating_sum')
+    op.drop_column('movies', 'rating_count')
@@ -0,0 +1,22 @@
+"""Add keyset pagination index on reviews
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reviews_movie_id_created_at_id', 'reviews', ['movie_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reviews_movie_id_created_at_id', table_name='reviews')
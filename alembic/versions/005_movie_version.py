@@ -0,0 +1,33 @@
+"""Add version and updated_at to movies
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('movies', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+    op.add_column('movies', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()))
+    op.execute(
+        """
+        UPDATE movies m SET updated_at = greatest(
+            m.created_at,
+            (SELECT max(r.updated_at) FROM reviews r WHERE r.movie_id = m.id)
+        )
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('movies', 'updated_at')
+    op.drop_column('movies', 'version')
@@ -0,0 +1,55 @@
+"""Add full-text search vector to movies
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('movies', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION movies_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+                setweight(to_tsvector('russian', coalesce(NEW.tagline, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(NEW.tagline, '')), 'B') ||
+                setweight(to_tsvector('russian', coalesce(NEW.director, '')), 'B') ||
+                setweight(to_tsvector('english', coalesce(NEW.director, '')), 'B') ||
+                setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C') ||
+                setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER movies_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, tagline, description, director ON movies
+        FOR EACH ROW EXECUTE FUNCTION movies_search_vector_update()
+        """
+    )
+    # Fill the vector for existing rows through the trigger
+    op.execute("UPDATE movies SET name = name")
+    op.create_index('ix_movies_search_vector', 'movies', ['search_vector'], postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movies_search_vector', table_name='movies')
+    op.execute("DROP TRIGGER IF EXISTS movies_search_vector_trigger ON movies")
+    op.execute("DROP FUNCTION IF EXISTS movies_search_vector_update()")
+    op.drop_column('movies', 'search_vector')
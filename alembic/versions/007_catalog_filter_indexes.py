@@ -0,0 +1,41 @@
+"""Add catalog sorting and filtering indexes
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'movies',
+        sa.Column(
+            'rating_sort_key',
+            sa.Float(),
+            sa.Computed("CASE WHEN rating_count > 0 THEN rating_sum::double precision / rating_count ELSE -1 END"),
+            nullable=False,
+        ),
+    )
+    op.create_index('ix_movies_year_id', 'movies', ['year', 'id'])
+    op.create_index('ix_movies_name_id', 'movies', ['name', 'id'])
+    op.create_index('ix_movies_rating_sort_key_id', 'movies', ['rating_sort_key', 'id'])
+    op.create_index('ix_movies_country_year', 'movies', ['country', 'year'])
+    op.create_index('ix_movie_genres_genre_id_movie_id', 'movie_genres', ['genre_id', 'movie_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_movie_genres_genre_id_movie_id', table_name='movie_genres')
+    op.drop_index('ix_movies_country_year', table_name='movies')
+    op.drop_index('ix_movies_rating_sort_key_id', table_name='movies')
+    op.drop_index('ix_movies_name_id', table_name='movies')
+    op.drop_index('ix_movies_year_id', table_name='movies')
+    op.drop_column('movies', 'rating_sort_key')
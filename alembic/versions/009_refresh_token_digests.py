@@ -0,0 +1,40 @@
+"""Store refresh tokens as digests and index them by user and expiry
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Expired tokens are not worth converting
+    op.execute("DELETE FROM refresh_tokens WHERE expires_at <= now()")
+    op.add_column('refresh_tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+    op.execute("UPDATE refresh_tokens SET token_hash = encode(sha256(convert_to(token, 'UTF8')), 'hex')")
+    op.alter_column('refresh_tokens', 'token_hash', nullable=False)
+    op.drop_index('ix_refresh_tokens_token', table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'token')
+    op.create_index('ix_refresh_tokens_token_hash', 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index('ix_refresh_tokens_user_id_created_at', 'refresh_tokens', ['user_id', 'created_at'])
+    op.create_index('ix_refresh_tokens_expires_at', 'refresh_tokens', ['expires_at'])
+
+
+def downgrade() -> None:
+    # The tokens cannot be recovered from their digests; stored digests keep the rows unique
+    op.drop_index('ix_refresh_tokens_expires_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_user_id_created_at', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_token_hash', table_name='refresh_tokens')
+    op.add_column('refresh_tokens', sa.Column('token', sa.String(), nullable=True))
+    op.execute("UPDATE refresh_tokens SET token = token_hash")
+    op.alter_column('refresh_tokens', 'token', nullable=False)
+    op.drop_column('refresh_tokens', 'token_hash')
+    op.create_index('ix_refresh_tokens_token', 'refresh_tokens', ['token'], unique=True)
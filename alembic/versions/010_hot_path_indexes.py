@@ -0,0 +1,54 @@
+"""Add indexes for per-user review and favorite lookups
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-18 00:00:00.000000
+
+Indexes are built CONCURRENTLY, outside the migration transaction, so the
+migration can run against a live database without blocking writes.
+``reviews.movie_id`` is already covered by ix_reviews_movie_id_created_at_id
+(004) and ``refresh_tokens.user_id`` by ix_refresh_tokens_user_id_created_at
+(009).
+"""
+from alembic import op
+import sqlalchemy as sa
+from migration_utils import drop_index_if_invalid
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A failed concurrent unique build leaves an invalid index behind, so check first
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT count(*) FROM (SELECT 1 FROM reviews GROUP BY user_id, movie_id HAVING count(*) > 1) AS d"
+    )).scalar()
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} (user, movie) pairs have more than one review; "
+            "remove the duplicate reviews and run `python -m app.reconcile_ratings` before upgrading"
+        )
+    
+    with op.get_context().autocommit_block():
+        # Duplicate-review check and the user's reviews (user_id prefix);
+        # a duplicate inserted during the build fails it loudly
+        drop_index_if_invalid('ix_reviews_user_id_movie_id')
+        op.create_index(
+            'ix_reviews_user_id_movie_id', 'reviews', ['user_id', 'movie_id'],
+            unique=True, postgresql_concurrently=True, if_not_exists=True,
+        )
+        # Favorites of a movie, e.g. when the movie is deleted
+        drop_index_if_invalid('ix_favorite_movies_movie_id')
+        op.create_index(
+            'ix_favorite_movies_movie_id', 'favorite_movies', ['movie_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_favorite_movies_movie_id', table_name='favorite_movies', postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_reviews_user_id_movie_id', table_name='reviews', postgresql_concurrently=True, if_exists=True)
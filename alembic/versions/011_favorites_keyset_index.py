@@ -0,0 +1,32 @@
+"""Add keyset index for a user's favorites, newest first
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+from migration_utils import drop_index_if_invalid
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        drop_index_if_invalid('ix_favorite_movies_user_id_created_at_movie_id')
+        op.create_index(
+            'ix_favorite_movies_user_id_created_at_movie_id', 'favorite_movies', ['user_id', 'created_at', 'movie_id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_favorite_movies_user_id_created_at_movie_id', table_name='favorite_movies',
+            postgresql_concurrently=True, if_exists=True,
+        )
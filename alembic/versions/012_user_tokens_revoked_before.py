@@ -0,0 +1,40 @@
+"""Store the per-user access token revocation cutoff on users
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-18 00:00:00.000000
+
+Access tokens issued before ``users.tokens_revoked_before`` (the user's last
+logout) are rejected. The partial index serves the workers' periodic load
+of recent cutoffs; it is built CONCURRENTLY, and the column is added with
+IF NOT EXISTS, so a migration interrupted during the build can be re-run.
+"""
+from alembic import op
+import sqlalchemy as sa
+from migration_utils import drop_index_if_invalid
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE users ADD COLUMN IF NOT EXISTS tokens_revoked_before TIMESTAMP WITH TIME ZONE")
+    with op.get_context().autocommit_block():
+        drop_index_if_invalid('ix_users_tokens_revoked_before')
+        op.create_index(
+            'ix_users_tokens_revoked_before', 'users', ['tokens_revoked_before'],
+            postgresql_where=sa.text('tokens_revoked_before IS NOT NULL'),
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_users_tokens_revoked_before', table_name='users',
+            postgresql_concurrently=True, if_exists=True,
+        )
+    op.drop_column('users', 'tokens_revoked_before')
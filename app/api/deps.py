@@ -1,25 +1,26 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from app.dependencies import DbSession, get_session
 from app.core.security import decode_token
-from app.models.user import User
-from app.core.exceptions import UnauthorizedException
+from app.schemas.user import ProfileModel
+from app.schemas.token import TokenData
+from app.schemas.movie import MovieFilters, MovieSort, SortOrder
+from app.core.exceptions import UnauthorizedException, NotFoundException
+from app.services.async_service import run_service
+from app.services.user_service import get_user_principal
+from app.services.auth_service import is_access_token_revoked
+from typing import Optional, Tuple
 from uuid import UUID
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user."""
-    token = credentials.credentials
-    
+def _verified_access_token(credentials: HTTPAuthorizationCredentials) -> Tuple[UUID, dict]:
+    """User ID and payload of a valid, unrevoked access token."""
     # Decode token
-    payload = decode_token(token)
-    if payload is None:
+    payload = decode_token(credentials.credentials)
+    if payload is None or payload.get("type") != "access":
         raise UnauthorizedException("Could not validate credentials")
     
     # Get user_id from token
@@ -32,10 +33,74 @@ def get_current_user(
     except ValueError:
         raise UnauthorizedException("Could not validate credentials")
     
-    # Get user from database
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise UnauthorizedException("User not found")
+    if is_access_token_revoked(payload):
+        raise UnauthorizedException("Token has been revoked")
     
-    return user
+    return user_id, payload
+
+
+def get_token_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+) -> TokenData:
+    """Get the authenticated user's identity from the access token alone, without a database query.
+
+    For routes that only need the user ID (and possibly the nickname and
+    avatar claims). Tokens stay usable until they expire or are revoked,
+    even if the user has been removed meanwhile.
+    """
+    user_id, payload = _verified_access_token(credentials)
+    return TokenData(user_id=user_id, nickName=payload.get("nickName"), avatar=payload.get("avatar"))
+
+
+async def get_current_user(
+    token_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
+) -> ProfileModel:
+    """Get current authenticated user, reading through the principal cache.
+
+    FastAPI resolves the dependency once per request, so handlers and other
+    dependencies share the loaded principal. The token is verified by the
+    sync get_token_user, which runs in the threadpool because a revocation
+    check may query the database.
+    """
+    try:
+        return await run_service(db, get_user_principal, token_user.user_id)
+    except NotFoundException:
+        raise UnauthorizedException("User not found")
+
+
+def get_optional_token_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+) -> Optional[TokenData]:
+    """Like get_token_user for routes that also serve anonymous callers.
+
+    Returns None without an Authorization header and for an invalid, expired
+    or revoked token: public routes then answer as for an anonymous caller.
+    """
+    if credentials is None:
+        return None
+    try:
+        return get_token_user(credentials)
+    except UnauthorizedException:
+        return None
+
 
+def get_movie_filters(
+    genreId: Optional[UUID] = Query(None),
+    yearFrom: Optional[int] = Query(None, ge=0),
+    yearTo: Optional[int] = Query(None, ge=0),
+    country: Optional[str] = Query(None, min_length=1),
+    ageLimit: Optional[int] = Query(None, ge=0),
+    sort: MovieSort = Query(MovieSort.Created),
+    order: SortOrder = Query(SortOrder.Asc),
+) -> MovieFilters:
+    """Read catalog filters and sorting from query parameters."""
+    return MovieFilters(
+        genreId=genreId,
+        yearFrom=yearFrom,
+        yearTo=yearTo,
+        country=country,
+        ageLimit=ageLimit,
+        sort=sort,
+        order=order,
+    )
@@ -1,38 +1,40 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from fastapi.security import HTTPAuthorizationCredentials
+from app.dependencies import DbSession, get_session
+from app.services.async_service import run_service
 from app.schemas.auth import UserRegisterModel, LoginCredentials, TokenResponse
 from app.services.auth_service import register_user, login_user, logout_user
-from app.api.deps import get_current_user
-from app.models.user import User
+from app.api.deps import get_current_user, security
+from app.schemas.user import ProfileModel
 
 router = APIRouter(prefix="/api/account", tags=["Account"])
 
 
 @router.post("/register", response_model=TokenResponse)
-def register(
+async def register(
     user_data: UserRegisterModel,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """Register a new user."""
-    return register_user(db, user_data)
+    return await register_user(db, user_data)
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(
+async def login(
     credentials: LoginCredentials,
-    db: Session = Depends(get_db)
+    db: DbSession = Depends(get_session)
 ):
     """Login user."""
-    return login_user(db, credentials)
+    return await login_user(db, credentials)
 
 
 @router.post("/logout")
-def logout(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: ProfileModel = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
 ):
     """Logout user."""
-    logout_user(db, current_user.id, "")
+    await run_service(db, logout_user, current_user.id, credentials.credentials)
     return {"message": "Successfully logged out"}
 
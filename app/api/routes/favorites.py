@@ -1,42 +1,48 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.schemas.movie import MoviesListModel
+from fastapi import APIRouter, Depends, Query
+from app.dependencies import DbSession, get_session, get_read_session
+from app.utils.serialization import ORJSONResponse
+from app.services.async_service import run_service
+from app.schemas.movie import MoviesCursorListModel, MovieListView
 from app.services.favorite_service import get_favorite_movies, add_favorite_movie, remove_favorite_movie
-from app.api.deps import get_current_user
-from app.models.user import User
+from app.api.deps import get_token_user
+from app.schemas.token import TokenData
+from app.config import settings
+from typing import Optional
 from uuid import UUID
 
 router = APIRouter(prefix="/api/favorites", tags=["Favorites"])
 
 
-@router.get("/", response_model=MoviesListModel)
-def get_favorites(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+@router.get("/", response_model=MoviesCursorListModel)
+async def get_favorites(
+    cursor: Optional[str] = Query(None),
+    size: int = Query(settings.FAVORITES_PAGE_SIZE, ge=1, le=settings.FAVORITES_MAX_PAGE_SIZE),
+    view: MovieListView = Query(MovieListView.Full),
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_read_session)
 ):
-    """Get user's favorite movies."""
-    return get_favorite_movies(db, current_user.id)
+    """Get user's favorite movies using cursor pagination, most recently added first."""
+    return ORJSONResponse(await run_service(db, get_favorite_movies, current_user.user_id, cursor, size, view))
 
 
 @router.post("/{id}/add")
-def add_to_favorites(
+async def add_to_favorites(
     id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
 ):
     """Add movie to favorites."""
-    add_favorite_movie(db, current_user.id, id)
+    await run_service(db, add_favorite_movie, current_user.user_id, id)
     return {"message": "Movie added to favorites"}
 
 
 @router.delete("/{id}/delete")
-def remove_from_favorites(
+async def remove_from_favorites(
     id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
 ):
     """Remove movie from favorites."""
-    remove_favorite_movie(db, current_user.id, id)
+    await run_service(db, remove_favorite_movie, current_user.user_id, id)
     return {"message": "Movie removed from favorites"}
 
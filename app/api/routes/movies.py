@@ -1,27 +1,148 @@
-from fastapi import APIRouter, Depends, Path
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.schemas.movie import MovieDetailsModel, MoviesPagedListModel
-from app.services.movie_service import get_movies_paged, get_movie_details
+from fastapi import APIRouter, Depends, Path, Query, Request, Response
+from typing import Optional
+from app.config import settings
+from app.dependencies import DbSession, get_read_session
+from app.utils.serialization import ORJSONResponse, dumps
+from app.services.async_service import run_service, get_movies_paged_document, get_movies_by_cursor_json
+from app.api.deps import get_movie_filters, get_optional_token_user
+from app.schemas.movie import (
+    MovieDetailsModel,
+    MovieDetailsBatchRequestModel,
+    MovieDetailsBatchModel,
+    MoviesPagedListModel,
+    MoviesCursorListModel,
+    MovieListView,
+    MovieFilters,
+    MovieFacetsModel,
+)
+from app.services.movie_service import (
+    get_movie_facets,
+    get_movie_details_document,
+    get_movie_details_batch_json,
+)
+from app.services.search_service import search_movies
+from app.services.favorite_service import flag_favorites
+from app.schemas.token import TokenData
+from app.services.read_routing import pin_primary_after_write, movie_scope, CATALOG_SCOPE
+from app.utils.conditional import content_etag, is_not_modified, validator_headers
 from uuid import UUID
+import orjson
 
 router = APIRouter(prefix="/api/movies", tags=["Movies"])
 
+# Responses carry isFavorite flags for authenticated callers
+VARY_AUTHORIZATION = {"Vary": "Authorization"}
+
+
+async def _with_favorite_flags(
+    db: DbSession,
+    current_user: TokenData,
+    content: bytes,
+    list_key: Optional[str] = "movies",
+) -> bytes:
+    """Copy of a cached movie list (or details, without ``list_key``) with the user's favorite flags."""
+    payload = orjson.loads(content)
+    movies = payload[list_key] if list_key else [payload]
+    await run_service(db, flag_favorites, current_user.user_id, movies)
+    return dumps(payload)
+
+
+@router.get("/", response_model=MoviesCursorListModel)
+async def get_movies_cursor(
+    cursor: Optional[str] = Query(None),
+    size: int = Query(settings.MOVIES_PAGE_SIZE, ge=1, le=settings.MOVIES_MAX_PAGE_SIZE),
+    view: MovieListView = Query(MovieListView.Full),
+    filters: MovieFilters = Depends(get_movie_filters),
+    current_user: Optional[TokenData] = Depends(get_optional_token_user),
+    db: DbSession = Depends(get_read_session)
+):
+    """Get filtered list of movies using cursor pagination."""
+    await pin_primary_after_write(db, CATALOG_SCOPE)
+    content = await get_movies_by_cursor_json(db, cursor, size, view, filters)
+    if current_user is not None:
+        content = await _with_favorite_flags(db, current_user, content)
+    return Response(content=content, media_type="application/json", headers=VARY_AUTHORIZATION)
+
+
+@router.get("/facets", response_model=MovieFacetsModel)
+async def get_facets(
+    filters: MovieFilters = Depends(get_movie_filters),
+    db: DbSession = Depends(get_read_session)
+):
+    """Get movie counts per genre, year and country for the filters."""
+    await pin_primary_after_write(db, CATALOG_SCOPE)
+    return await run_service(db, get_movie_facets, filters)
+
+
+@router.get("/search", response_model=MoviesCursorListModel)
+async def search(
+    query: str = Query(..., min_length=1, max_length=200),
+    cursor: Optional[str] = Query(None),
+    size: int = Query(settings.MOVIES_PAGE_SIZE, ge=1, le=settings.MOVIES_MAX_PAGE_SIZE),
+    view: MovieListView = Query(MovieListView.Full),
+    current_user: Optional[TokenData] = Depends(get_optional_token_user),
+    db: DbSession = Depends(get_read_session)
+):
+    """Full-text search over movies, most relevant first."""
+    await pin_primary_after_write(db, CATALOG_SCOPE)
+    result = await run_service(db, search_movies, query, cursor, size, view)
+    if current_user is not None:
+        await run_service(db, flag_favorites, current_user.user_id, result["movies"])
+    return ORJSONResponse(result, headers=VARY_AUTHORIZATION)
+
 
 @router.get("/{page}", response_model=MoviesPagedListModel)
-def get_movies(
+async def get_movies(
+    request: Request,
     page: int = Path(..., ge=1),
-    db: Session = Depends(get_db)
+    size: int = Query(settings.MOVIES_PAGE_SIZE, ge=1, le=settings.MOVIES_MAX_PAGE_SIZE),
+    view: MovieListView = Query(MovieListView.Full),
+    filters: MovieFilters = Depends(get_movie_filters),
+    current_user: Optional[TokenData] = Depends(get_optional_token_user),
+    db: DbSession = Depends(get_read_session)
 ):
-    """Get paginated list of movies."""
-    return get_movies_paged(db, page)
+    """Get filtered, paginated list of movies."""
+    await pin_primary_after_write(db, CATALOG_SCOPE)
+    content, etag, last_modified = await get_movies_paged_document(db, page, size, view, filters)
+    if current_user is not None:
+        # Favorites change without the movies changing: validate by ETag only
+        content = await _with_favorite_flags(db, current_user, content)
+        etag, last_modified = content_etag(content), None
+    headers = {**validator_headers(etag, last_modified, private=current_user is not None), **VARY_AUTHORIZATION}
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
 
 
 @router.get("/details/{id}", response_model=MovieDetailsModel)
-def get_movie(
+async def get_movie(
+    request: Request,
     id: UUID,
-    db: Session = Depends(get_db)
+    current_user: Optional[TokenData] = Depends(get_optional_token_user),
+    db: DbSession = Depends(get_read_session)
 ):
     """Get movie details."""
-    return get_movie_details(db, id)
+    await pin_primary_after_write(db, movie_scope(id))
+    content, etag, last_modified = await run_service(db, get_movie_details_document, id)
+    if current_user is not None:
+        # Favorites change without the movie changing: validate by ETag only
+        content = await _with_favorite_flags(db, current_user, content, list_key=None)
+        etag, last_modified = content_etag(content), None
+    headers = {**validator_headers(etag, last_modified, private=current_user is not None), **VARY_AUTHORIZATION}
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="application/json", headers=headers)
+
 
+@router.post("/details/batch", response_model=MovieDetailsBatchModel)
+async def get_movies_batch(
+    batch: MovieDetailsBatchRequestModel,
+    current_user: Optional[TokenData] = Depends(get_optional_token_user),
+    db: DbSession = Depends(get_read_session)
+):
+    """Get details of several movies in request order."""
+    await pin_primary_after_write(db, *(movie_scope(movie_id) for movie_id in batch.ids))
+    content = await run_service(db, get_movie_details_batch_json, batch.ids)
+    if current_user is not None:
+        content = await _with_favorite_flags(db, current_user, content)
+    return Response(content=content, media_type="application/json", headers=VARY_AUTHORIZATION)
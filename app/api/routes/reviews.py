@@ -1,48 +1,64 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
-from app.schemas.review import ReviewModifyModel
-from app.services.review_service import add_review, edit_review, delete_review
-from app.api.deps import get_current_user
-from app.models.user import User
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from app.config import settings
+from app.dependencies import DbSession, get_session, get_read_session
+from app.utils.serialization import ORJSONResponse
+from app.services.async_service import run_service
+from app.schemas.review import ReviewModifyModel, ReviewsPagedListModel
+from app.services.review_service import add_review, edit_review, delete_review, get_movie_reviews
+from app.services.read_routing import pin_primary_after_write, movie_scope
+from app.api.deps import get_token_user
+from app.schemas.token import TokenData
 from uuid import UUID
 
 router = APIRouter(prefix="/api/movie", tags=["Reviews"])
 
 
+@router.get("/{movieId}/reviews", response_model=ReviewsPagedListModel)
+async def get_reviews(
+    movieId: UUID,
+    cursor: Optional[str] = Query(None),
+    size: int = Query(settings.REVIEWS_PAGE_SIZE, ge=1, le=settings.REVIEWS_MAX_PAGE_SIZE),
+    db: DbSession = Depends(get_read_session)
+):
+    """Get movie reviews using cursor pagination, newest first."""
+    await pin_primary_after_write(db, movie_scope(movieId))
+    return ORJSONResponse(await run_service(db, get_movie_reviews, movieId, cursor, size))
+
+
 @router.post("/{movieId}/review/add")
-def add_movie_review(
+async def add_movie_review(
     movieId: UUID,
     review_data: ReviewModifyModel,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
 ):
     """Add a review to a movie."""
-    add_review(db, current_user.id, movieId, review_data)
+    await run_service(db, add_review, current_user.user_id, movieId, review_data)
     return {"message": "Review added successfully"}
 
 
 @router.put("/{movieId}/review/{id}/edit")
-def edit_movie_review(
+async def edit_movie_review(
     movieId: UUID,
     id: UUID,
     review_data: ReviewModifyModel,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
 ):
     """Edit a review."""
-    edit_review(db, current_user.id, movieId, id, review_data)
+    await run_service(db, edit_review, current_user.user_id, movieId, id, review_data)
     return {"message": "Review updated successfully"}
 
 
 @router.delete("/{movieId}/review/{id}/delete")
-def delete_movie_review(
+async def delete_movie_review(
     movieId: UUID,
     id: UUID,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(get_token_user),
+    db: DbSession = Depends(get_session)
 ):
     """Delete a review."""
-    delete_review(db, current_user.id, movieId, id)
+    await run_service(db, delete_review, current_user.user_id, movieId, id)
     return {"message": "Review deleted successfully"}
 
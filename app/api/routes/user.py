@@ -1,29 +1,28 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.dependencies import get_db
+from app.dependencies import DbSession, get_session
+from app.services.async_service import run_service
 from app.schemas.user import ProfileModel
-from app.services.user_service import get_user_profile, update_user_profile
+from app.services.user_service import update_user_profile
 from app.api.deps import get_current_user
-from app.models.user import User
 
 router = APIRouter(prefix="/api/account", tags=["Account"])
 
 
 @router.get("/profile", response_model=ProfileModel)
-def get_profile(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+async def get_profile(
+    current_user: ProfileModel = Depends(get_current_user)
 ):
     """Get user profile."""
-    return get_user_profile(db, current_user.id)
+    # The principal loaded by get_current_user is the profile
+    return current_user
 
 
 @router.put("/profile", response_model=ProfileModel)
-def update_profile(
+async def update_profile(
     profile_data: ProfileModel,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: ProfileModel = Depends(get_current_user),
+    db: DbSession = Depends(get_session)
 ):
     """Update user profile."""
-    return update_user_profile(db, current_user.id, profile_data)
+    return await run_service(db, update_user_profile, current_user.id, profile_data)
 
@@ -0,0 +1,53 @@
+"""Microbenchmark of access token encoding and decoding.
+
+Compares python-jose (used by the API), PyJWT (from requirements-dev.txt)
+and the verified-token cache in ``decode_token``:
+
+    python -m app.benchmark_jwt [iterations]
+"""
+import sys
+import timeit
+from jose import jwt as jose_jwt
+from app.config import settings
+from app.core.security import create_access_token, decode_token, verified_token_cache
+
+try:
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
+
+def _report(name: str, seconds: float, iterations: int):
+    print(f"{name:<36} {seconds / iterations * 1e6:8.2f} µs/op")
+
+
+def benchmark_jwt(iterations: int = 20000):
+    """Main benchmark function."""
+    claims = {"sub": "8f14e45f-ceea-467a-9575-2f3c4bd1d1a1", "nickName": "user", "avatar": None}
+    token = create_access_token(claims)
+    payload = jose_jwt.get_unverified_claims(token)
+    key, algorithm = settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM
+    
+    print(f"{iterations} iterations, {algorithm}")
+    _report("encode: python-jose", timeit.timeit(lambda: jose_jwt.encode(payload, key, algorithm=algorithm), number=iterations), iterations)
+    if pyjwt is not None:
+        _report("encode: PyJWT", timeit.timeit(lambda: pyjwt.encode(payload, key, algorithm=algorithm), number=iterations), iterations)
+    _report("encode: create_access_token", timeit.timeit(lambda: create_access_token(claims), number=iterations), iterations)
+    
+    _report("decode: python-jose", timeit.timeit(lambda: jose_jwt.decode(token, key, algorithms=[algorithm]), number=iterations), iterations)
+    if pyjwt is not None:
+        _report("decode: PyJWT", timeit.timeit(lambda: pyjwt.decode(token, key, algorithms=[algorithm]), number=iterations), iterations)
+    else:
+        print("decode: PyJWT                        skipped (pip install pyjwt)")
+    
+    # Distinct tokens, so every call verifies the signature
+    tokens = [create_access_token(claims) for _ in range(min(iterations, verified_token_cache.max_entries or iterations))]
+    uncached = iter(tokens * (iterations // len(tokens) + 1))
+    verified_token_cache._entries.clear()
+    _report("decode_token: cache miss", timeit.timeit(lambda: decode_token(next(uncached)), number=len(tokens)), len(tokens))
+    decode_token(token)
+    _report("decode_token: cache hit", timeit.timeit(lambda: decode_token(token), number=iterations), iterations)
+
+
+if __name__ == "__main__":
+    benchmark_jwt(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
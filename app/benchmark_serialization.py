@@ -0,0 +1,149 @@
+"""Benchmark of building and serializing a catalog page with many reviews.
+
+Creates one movie with ``reviews`` reviews (1000 by default) inside a
+transaction that is rolled back at the end and serializes it as a catalog
+page both ways:
+
+- ORM: the movie graph loaded with ``selectinload``, a Pydantic model built
+  per genre, review and author, then validated and serialized again by
+  FastAPI's response handling (the path before ``movie_builder``)
+- rows: Core rows turned into dicts by ``movie_builder`` and ``orjson``
+
+Both include loading from the database:
+
+    python -m app.benchmark_serialization [reviews] [runs]
+"""
+import asyncio
+import sys
+import time
+from typing import Callable
+from uuid import uuid4
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, selectinload
+from app.database import engine
+from app.models.genre import Genre
+from app.models.movie import Movie, MovieGenre
+from app.models.review import Review
+from app.models.user import User
+from app.schemas.movie import GenreModel, MovieElementModel, MoviesPagedListModel, PageInfoModel
+from app.schemas.review import ReviewModel
+from app.schemas.user import UserShortModel
+from app.services.movie_builder import MOVIE_ELEMENT_COLUMNS, build_movie_elements
+from app.utils.serialization import dumps
+
+# Response field FastAPI builds for response_model=MoviesPagedListModel
+_PAGE_FIELD = create_response_field(name="Response_get_movies", type_=MoviesPagedListModel)
+
+
+def _create_movie(db: Session, reviews: int):
+    """Insert a movie reviewed by ``reviews`` new users; returns its ID."""
+    genre_id, movie_id = uuid4(), uuid4()
+    user_ids = [uuid4() for _ in range(reviews)]
+    db.execute(insert(Genre), [{"id": genre_id, "name": f"benchmark-{genre_id.hex}"}])
+    db.execute(insert(Movie), [{
+        "id": movie_id, "name": "Benchmark", "poster": "https://example.com/poster.png",
+        "year": 2000, "country": "Benchmark", "time": 100, "age_limit": 12,
+        "rating_count": reviews, "rating_sum": 7 * reviews,
+    }])
+    db.execute(insert(MovieGenre), [{"movie_id": movie_id, "genre_id": genre_id}])
+    db.execute(insert(User), [
+        {"id": user_id, "username": f"benchmark-{user_id.hex}", "email": f"{user_id.hex}@example.com",
+         "name": "Benchmark", "password_hash": "unused", "gender": 0}
+        for user_id in user_ids
+    ])
+    db.execute(insert(Review), [
+        {"movie_id": movie_id, "user_id": user_id, "rating": 7, "review_text": "Benchmark review " * 5,
+         "is_anonymous": index % 10 == 0}
+        for index, user_id in enumerate(user_ids)
+    ])
+    return movie_id
+
+
+def _review_model(review: Review) -> ReviewModel:
+    author = None
+    if not review.is_anonymous:
+        author = UserShortModel(userId=review.user.id, nickName=review.user.username, avatar=review.user.avatar_link)
+    return ReviewModel(
+        id=review.id,
+        rating=review.rating,
+        reviewText=review.review_text,
+        isAnonymous=review.is_anonymous,
+        createDateTime=review.created_at,
+        author=author,
+    )
+
+
+def _orm_page(db: Session, movie_id, loop: asyncio.AbstractEventLoop) -> bytes:
+    movie = (
+        db.query(Movie)
+        .options(selectinload(Movie.genres), selectinload(Movie.reviews).selectinload(Review.user))
+        .filter(Movie.id == movie_id)
+        .one()
+    )
+    element = MovieElementModel(
+        id=movie.id,
+        name=movie.name,
+        poster=movie.poster,
+        year=movie.year,
+        country=movie.country,
+        genres=[GenreModel(id=genre.id, name=genre.name) for genre in movie.genres],
+        reviews=[_review_model(review) for review in movie.reviews],
+        ratingCount=movie.rating_count,
+        averageRating=movie.average_rating,
+    )
+    page = MoviesPagedListModel(movies=[element], pageInfo=PageInfoModel(size=1, count=1, current=1))
+    # What FastAPI does with a returned model and response_model=MoviesPagedListModel
+    content = loop.run_until_complete(serialize_response(field=_PAGE_FIELD, response_content=page))
+    return JSONResponse(content).body
+
+
+def _rows_page(db: Session, movie_id) -> bytes:
+    rows = db.query(*MOVIE_ELEMENT_COLUMNS).filter(Movie.id == movie_id).all()
+    return dumps({
+        "movies": build_movie_elements(db, rows),
+        "pageInfo": {"size": 1, "count": 1, "current": 1},
+    })
+
+
+def _measure(db: Session, build: Callable[[], bytes], runs: int) -> float:
+    """Average seconds per build; every run starts with an empty identity map."""
+    build()
+    elapsed = 0.0
+    for _ in range(runs):
+        db.expunge_all()
+        started = time.perf_counter()
+        build()
+        elapsed += time.perf_counter() - started
+    return elapsed / runs
+
+
+def benchmark_serialization(reviews: int = 1000, runs: int = 30):
+    """Main benchmark function."""
+    loop = asyncio.new_event_loop()
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        db = Session(bind=connection)
+        try:
+            movie_id = _create_movie(db, reviews)
+            size = len(_rows_page(db, movie_id))
+            print(f"Catalog page with 1 movie and {reviews} reviews ({size} bytes), {runs} runs")
+            
+            orm = _measure(db, lambda: _orm_page(db, movie_id, loop), runs)
+            rows = _measure(db, lambda: _rows_page(db, movie_id), runs)
+            print(f"{'ORM models + response validation':<36} {orm * 1e3:8.2f} ms/page")
+            print(f"{'Core rows + movie_builder + orjson':<36} {rows * 1e3:8.2f} ms/page")
+            print(f"{'speedup':<36} {orm / rows:8.1f}x")
+        finally:
+            db.close()
+            transaction.rollback()
+            loop.close()
+
+
+if __name__ == "__main__":
+    benchmark_serialization(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 30,
+    )
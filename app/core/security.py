@@ -1,11 +1,73 @@
+import asyncio
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.config import settings
-from uuid import UUID
+from app.core.exceptions import ServiceUnavailableException
+from uuid import UUID, uuid4
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Hashes with a different cost than PASSWORD_BCRYPT_ROUNDS, or with a
+# deprecated scheme, are reported as needing an update
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+
+class PasswordHashExecutor:
+    """Runs password hashing on a few dedicated threads.
+
+    A hash takes hundreds of milliseconds of CPU, so a burst of logins would
+    otherwise occupy every request thread. At most ``max_queue`` jobs wait
+    for a worker; when the queue is full, or a job waited longer than
+    ``queue_timeout`` seconds, callers get a 503 instead of piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int, queue_timeout: float):
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self.rejected = 0
+        self.timed_out = 0
+
+    def _run(self, enqueued_at: float, func: Callable[..., T], *args) -> T:
+        if time.monotonic() - enqueued_at > self.queue_timeout:
+            self.timed_out += 1
+            raise ServiceUnavailableException("Too many authentication requests")
+        return func(*args)
+
+    def submit(self, func: Callable[..., T], *args) -> "Future[T]":
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise ServiceUnavailableException("Too many authentication requests")
+        future = self._executor.submit(self._run, time.monotonic(), func, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Run ``func(*args)`` on the executor without holding a request thread."""
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self) -> dict:
+        return {"rejected": self.rejected, "timedOut": self.timed_out}
+
+
+password_hash_executor = PasswordHashExecutor(
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_QUEUE_SIZE,
+    settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,15 +80,33 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def hash_password(password: str) -> str:
+    """Hash a password on the password hashing executor."""
+    return await password_hash_executor.run(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the password hashing executor.
+
+    Returns whether it matches and, if the stored hash is outdated, a new
+    hash to store instead.
+    """
+    return await password_hash_executor.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create a JWT access token."""
+    """Create a JWT access token.
+
+    ``iat`` keeps sub-second precision so tokens issued right after a logout
+    are not mistaken for revoked ones.
+    """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    to_encode.update({"exp": expire, "iat": time.time(), "jti": uuid4().hex, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
@@ -39,18 +119,78 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    to_encode.update({"exp": expire, "jti": uuid4().hex, "type": "refresh"})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
+class VerifiedTokenCache:
+    """LRU of token digest -> verified payload; entries expire with the token.
+
+    Keyed by a SHA-256 digest so raw bearer tokens are not kept in memory.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, payload = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(payload)
+
+    def set(self, token: str, payload: dict) -> None:
+        expires_at = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires_at, (int, float)):
+            return
+        key = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            self._entries[key] = (expires_at, dict(payload))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+verified_token_cache = VerifiedTokenCache(settings.JWT_DECODE_CACHE_SIZE)
+
+
+def token_digest(token: str) -> str:
+    """Fixed-width digest under which a token is stored."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def decode_token(token: str) -> Optional[dict]:
-    """Decode and verify a JWT token."""
+    """Decode and verify a JWT token.
+
+    Verified payloads are cached until the token expires, so a token
+    presented again skips the signature check and JSON parsing.
+    """
+    payload = verified_token_cache.get(token)
+    if payload is not None:
+        return payload
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
         return None
+    verified_token_cache.set(token, payload)
+    return payload
 
 
 def get_token_expire_time(token_type: str = "refresh") -> datetime:
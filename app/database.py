@@ -1,11 +1,124 @@
+import itertools
+import threading
+import time
+from typing import Dict, List
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
+from app.utils.pool_metrics import PoolMetrics, instrumented_pool_class
 
-engine = create_engine(settings.DATABASE_URL)
+
+def _pool_options(pool_class, metrics: PoolMetrics) -> dict:
+    return {
+        "poolclass": instrumented_pool_class(pool_class, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _async_url(url: str):
+    return make_url(url).set(drivername="postgresql+asyncpg")
+
+
+class RoutingSession(Session):
+    """Session that reads from the replica chosen for it.
+
+    Statements go to ``info["replica"]`` unless ``info["primary"]`` is set;
+    flushes always go to the bound primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica = self.info.get("replica")
+        if replica is not None and not self.info.get("primary") and not self._flushing:
+            return replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+class ReplicaRouter:
+    """Round-robin over replica engines, skipping replicas that recently failed."""
+
+    def __init__(self, engines: List, retry_seconds: int):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._down_until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> List:
+        """Healthy replicas, starting with the next one in turn."""
+        if not self.engines:
+            return []
+        
+        start = next(self._next)
+        now = time.monotonic()
+        with self._lock:
+            down_until = dict(self._down_until)
+        ordered = [
+            (start + offset) % len(self.engines) for offset in range(len(self.engines))
+        ]
+        return [self.engines[index] for index in ordered if down_until.get(index, 0) <= now]
+
+    def mark_down(self, engine) -> None:
+        with self._lock:
+            self._down_until[self.engines.index(engine)] = time.monotonic() + self.retry_seconds
+
+    def is_healthy(self, engine) -> bool:
+        with self._lock:
+            return self._down_until.get(self.engines.index(engine), 0) <= time.monotonic()
+
+
+pool_metrics = PoolMetrics()
+engine = create_engine(settings.DATABASE_URL, **_pool_options(QueuePool, pool_metrics))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only routes get a routing session over the primary and the replicas
+replica_pool_metrics = [PoolMetrics() for _ in settings.DATABASE_REPLICA_URLS]
+replica_engines: List[Engine] = [
+    create_engine(url, **_pool_options(QueuePool, metrics))
+    for url, metrics in zip(settings.DATABASE_REPLICA_URLS, replica_pool_metrics)
+]
+replica_router = ReplicaRouter(replica_engines, settings.DB_REPLICA_RETRY_SECONDS)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# The async engines talk to the same databases through asyncpg
+async_pool_metrics = PoolMetrics()
+async_engine = None
+AsyncSessionLocal = None
+async_replica_pool_metrics = [PoolMetrics() for _ in settings.DATABASE_REPLICA_URLS]
+async_replica_engines = []
+async_replica_router = ReplicaRouter([], settings.DB_REPLICA_RETRY_SECONDS)
+AsyncReadSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_async_engine(
+        _async_url(settings.DATABASE_URL),
+        **_pool_options(AsyncAdaptedQueuePool, async_pool_metrics),
+    )
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+    async_replica_engines = [
+        create_async_engine(_async_url(url), **_pool_options(AsyncAdaptedQueuePool, metrics))
+        for url, metrics in zip(settings.DATABASE_REPLICA_URLS, async_replica_pool_metrics)
+    ]
+    async_replica_router = ReplicaRouter(async_replica_engines, settings.DB_REPLICA_RETRY_SECONDS)
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        autoflush=False,
+        expire_on_commit=False,
+    )
+
 Base = declarative_base()
 
 
@@ -15,4 +128,3 @@ def get_db():
         yield db
     finally:
         db.close()
-
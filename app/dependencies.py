@@ -1,6 +1,22 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator, Optional, Union
+from fastapi import Request
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from app.config import settings
+from app.core.security import decode_token
+from app.database import (
+    SessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    AsyncReadSessionLocal,
+    replica_router,
+    async_replica_router,
+)
+from app.services.read_routing import recently_written, recently_written_async, user_scope
+
+# Session type of API routes, see get_session
+DbSession = Union[Session, AsyncSession]
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -10,3 +26,70 @@ def get_db() -> Generator[Session, None, None]:
     finally:
         db.close()
 
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _caller_scope(request: Request) -> Optional[str]:
+    """Read-routing scope of the (optionally) authenticated caller."""
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload: Optional[dict] = decode_token(token)
+    subject = payload.get("sub") if payload else None
+    return user_scope(subject) if subject is not None else None
+
+
+def _reads_own_writes(request: Request) -> bool:
+    """Whether the caller wrote recently and must read from the primary."""
+    scope = _caller_scope(request)
+    return scope is not None and recently_written(scope)
+
+
+async def _reads_own_writes_async(request: Request) -> bool:
+    """_reads_own_writes for the event loop."""
+    scope = _caller_scope(request)
+    return scope is not None and await recently_written_async(scope)
+
+
+def get_read_db(request: Request) -> Generator[Session, None, None]:
+    """Session for read-only services: a healthy replica in turn, the primary as fallback."""
+    db = ReadSessionLocal()
+    try:
+        if not _reads_own_writes(request):
+            for replica in replica_router.candidates():
+                try:
+                    db.connection(bind_arguments={"bind": replica})
+                except (DBAPIError, OSError):
+                    db.rollback()
+                    replica_router.mark_down(replica)
+                    continue
+                db.info["replica"] = replica
+                break
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """Async variant of get_read_db."""
+    async with AsyncReadSessionLocal() as db:
+        if not await _reads_own_writes_async(request):
+            for replica in async_replica_router.candidates():
+                try:
+                    await db.connection(bind_arguments={"bind": replica.sync_engine})
+                except (DBAPIError, OSError):
+                    await db.rollback()
+                    async_replica_router.mark_down(replica)
+                    continue
+                db.info["replica"] = replica.sync_engine
+                break
+        yield db
+
+
+# Session dependencies of API routes: AsyncSession when DATABASE_ASYNC is set, Session otherwise.
+# Routes pass them to app.services.async_service, which handles both.
+get_session = get_async_db if settings.DATABASE_ASYNC else get_db
+get_read_session = get_async_read_db if settings.DATABASE_ASYNC else get_read_db
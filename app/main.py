@@ -2,6 +2,22 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.api.routes import auth, user, movies, favorites, reviews
+from app.services.cache import movie_details_cache, catalog_cache, principal_cache
+from app.services.token_revocation import revoked_token_filter
+from app.services.auth_service import refresh_token_purge
+from app.core.security import verified_token_cache, password_hash_executor
+from app.database import (
+    engine,
+    async_engine,
+    pool_metrics,
+    async_pool_metrics,
+    replica_engines,
+    replica_pool_metrics,
+    replica_router,
+    async_replica_engines,
+    async_replica_pool_metrics,
+    async_replica_router,
+)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -33,6 +49,35 @@ app.include_router(favorites.router)
 app.include_router(reviews.router)
 
 
+@app.on_event("startup")
+def start_token_revocation_refresh():
+    if settings.ACCESS_TOKEN_REVOCATION_CHECK:
+        revoked_token_filter.start(settings.TOKEN_REVOCATION_REFRESH_SECONDS)
+
+
+@app.on_event("shutdown")
+def stop_token_revocation_refresh():
+    revoked_token_filter.stop()
+
+
+@app.on_event("startup")
+def start_refresh_token_purge():
+    refresh_token_purge.start(settings.REFRESH_TOKEN_PURGE_INTERVAL_SECONDS)
+
+
+@app.on_event("shutdown")
+def stop_refresh_token_purge():
+    refresh_token_purge.stop()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
+
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to MovieCatalog.API"}
@@ -42,3 +87,37 @@ def read_root():
 def health_check():
     return {"status": "healthy"}
 
+
+
+@app.get("/metrics/cache")
+def cache_metrics():
+    return {
+        "movieDetails": movie_details_cache.stats(),
+        "catalog": catalog_cache.stats(),
+        "principal": principal_cache.stats(),
+        "tokenRevocation": revoked_token_filter.stats(),
+        "verifiedTokens": verified_token_cache.stats(),
+    }
+
+
+@app.get("/metrics/auth")
+def auth_metrics():
+    return {"passwordHashing": password_hash_executor.stats()}
+
+
+@app.get("/metrics/db")
+def db_pool_metrics():
+    metrics = {
+        "sync": pool_metrics.stats(engine.pool),
+        "syncReplicas": [
+            dict(metrics.stats(replica.pool), healthy=replica_router.is_healthy(replica))
+            for replica, metrics in zip(replica_engines, replica_pool_metrics)
+        ],
+    }
+    if async_engine is not None:
+        metrics["async"] = async_pool_metrics.stats(async_engine.sync_engine.pool)
+        metrics["asyncReplicas"] = [
+            dict(metrics.stats(replica.sync_engine.pool), healthy=async_replica_router.is_healthy(replica))
+            for replica, metrics in zip(async_replica_engines, async_replica_pool_metrics)
+        ]
+    return metrics
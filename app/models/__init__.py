@@ -1,5 +1,5 @@
 from app.models.user import User
-from app.models.token import RefreshToken
+from app.models.token import RefreshToken, RevokedToken
 from app.models.genre import Genre
 from app.models.movie import Movie, MovieGenre
 from app.models.review import Review
@@ -8,6 +8,7 @@ from app.models.favorite import FavoriteMovie
 __all__ = [
     "User",
     "RefreshToken",
+    "RevokedToken",
     "Genre",
     "Movie",
     "MovieGenre",
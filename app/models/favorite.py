@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, ForeignKey
+from sqlalchemy import Column, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.database import Base
@@ -7,7 +7,14 @@ from app.database import Base
 class FavoriteMovie(Base):
     __tablename__ = "favorite_movies"
 
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
-    movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE", name="fk_favorite_movies_user_id"), primary_key=True)
+    movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id", ondelete="CASCADE", name="fk_favorite_movies_movie_id"), primary_key=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # The primary key only serves lookups by user
+        Index("ix_favorite_movies_movie_id", "movie_id"),
+        # Keyset pagination of a user's favorites, newest first
+        Index("ix_favorite_movies_user_id_created_at_movie_id", "user_id", "created_at", "movie_id"),
+    )
+
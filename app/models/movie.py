@@ -1,10 +1,17 @@
 import uuid
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Integer, Float, Text, DateTime, ForeignKey, Index, Computed, DDL, event
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
 
+# Reviews are rated from 0 to 10, one histogram bucket per rating value
+RATING_BUCKETS = 11
+
+
+def empty_rating_histogram() -> list:
+    return [0] * RATING_BUCKETS
+
 
 class Movie(Base):
     __tablename__ = "movies"
@@ -22,11 +29,80 @@ class Movie(Base):
     fees = Column(Integer, nullable=True)
     age_limit = Column(Integer, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped whenever the movie or its reviews change, which also moves updated_at (Last-Modified)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    # Rating aggregates, maintained by the review service
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0")
+    rating_histogram = Column(
+        ARRAY(Integer, zero_indexes=True),
+        nullable=False,
+        default=empty_rating_histogram,
+        server_default="{" + ",".join(["0"] * RATING_BUCKETS) + "}",
+    )
+    # Average rating for sorting; -1 for unrated movies so they sort below any rating
+    rating_sort_key = Column(
+        Float,
+        Computed("CASE WHEN rating_count > 0 THEN rating_sum::double precision / rating_count ELSE -1 END"),
+        nullable=False,
+    )
+
+    # Full-text search document, maintained by a trigger (see below)
+    search_vector = deferred(Column(TSVECTOR().with_variant(Text(), "sqlite"), nullable=True))
 
     # Relationships
     genres = relationship("Genre", secondary="movie_genres", backref="movies")
     reviews = relationship("Review", back_populates="movie", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Stable ordering for keyset pagination of the catalog
+        Index("ix_movies_created_at_id", "created_at", "id"),
+        Index("ix_movies_search_vector", "search_vector", postgresql_using="gin"),
+        # Catalog sorting and filtering
+        Index("ix_movies_year_id", "year", "id"),
+        Index("ix_movies_name_id", "name", "id"),
+        Index("ix_movies_rating_sort_key_id", "rating_sort_key", "id"),
+        Index("ix_movies_country_year", "country", "year"),
+    )
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+
+# Seed data is Russian, but titles and names are often English, so every
+# field is indexed with both configurations.
+MOVIE_SEARCH_FUNCTION_DDL = """
+CREATE OR REPLACE FUNCTION movies_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('russian', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('russian', coalesce(NEW.tagline, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.tagline, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.director, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.director, '')), 'B') ||
+        setweight(to_tsvector('russian', coalesce(NEW.description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+MOVIE_SEARCH_TRIGGER_DDL = """
+CREATE TRIGGER movies_search_vector_trigger
+BEFORE INSERT OR UPDATE OF name, tagline, description, director ON movies
+FOR EACH ROW EXECUTE FUNCTION movies_search_vector_update()
+"""
+
+# Installed by Base.metadata.create_all (seed); Alembic installs them in migration 006
+event.listen(Movie.__table__, "after_create", DDL(MOVIE_SEARCH_FUNCTION_DDL).execute_if(dialect="postgresql"))
+event.listen(Movie.__table__, "after_create", DDL(MOVIE_SEARCH_TRIGGER_DDL).execute_if(dialect="postgresql"))
+
 
 class MovieGenre(Base):
     __tablename__ = "movie_genres"
@@ -34,3 +110,8 @@ class MovieGenre(Base):
     movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id", ondelete="CASCADE"), primary_key=True)
     genre_id = Column(UUID(as_uuid=True), ForeignKey("genres.id", ondelete="CASCADE"), primary_key=True)
 
+    __table_args__ = (
+        # The primary key only serves lookups by movie_id
+        Index("ix_movie_genres_genre_id_movie_id", "genre_id", "movie_id"),
+    )
+
@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -10,8 +10,8 @@ class Review(Base):
     __tablename__ = "reviews"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id", ondelete="CASCADE"), nullable=False)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    movie_id = Column(UUID(as_uuid=True), ForeignKey("movies.id", ondelete="CASCADE", name="fk_reviews_movie_id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE", name="fk_reviews_user_id"), nullable=False)
     rating = Column(Integer, nullable=False)  # 0-10
     review_text = Column(Text, nullable=False)
     is_anonymous = Column(Boolean, default=False, nullable=False)
@@ -22,3 +22,10 @@ class Review(Base):
     movie = relationship("Movie", back_populates="reviews")
     user = relationship("User")
 
+
+    __table_args__ = (
+        # Keyset pagination of a movie's reviews, newest first
+        Index("ix_reviews_movie_id_created_at_id", "movie_id", "created_at", "id"),
+        # One review per user and movie; also serves lookups by user
+        Index("ix_reviews_user_id_movie_id", "user_id", "movie_id", unique=True),
+    )
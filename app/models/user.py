@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.sql import func
 from app.database import Base
@@ -18,4 +18,14 @@ class User(Base):
     avatar_link = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Last logout; access tokens issued before it are rejected, see token_revocation
+    tokens_revoked_before = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index(
+            "ix_users_tokens_revoked_before",
+            "tokens_revoked_before",
+            postgresql_where=text("tokens_revoked_before IS NOT NULL"),
+        ),
+    )
 
@@ -0,0 +1,23 @@
+"""Recompute movie rating aggregates from the reviews table."""
+from app.database import SessionLocal
+from app.services.rating_service import recompute_rating_aggregates
+from app.services.review_service import invalidate_movie_caches
+
+
+def reconcile_ratings():
+    """Main reconciliation function."""
+    db = SessionLocal()
+    try:
+        movie_ids = recompute_rating_aggregates(db)
+        invalidate_movie_caches(*movie_ids)
+        print(f"✓ Recomputed rating aggregates for {len(movie_ids)} movies")
+    except Exception as e:
+        print(f"\n❌ Error during reconciliation: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    reconcile_ratings()
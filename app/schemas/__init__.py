@@ -2,12 +2,24 @@ from app.schemas.auth import UserRegisterModel, LoginCredentials, TokenResponse
 from app.schemas.user import ProfileModel, UserShortModel, Gender
 from app.schemas.movie import (
     MovieElementModel,
+    MovieSummaryModel,
+    MovieListView,
     MovieDetailsModel,
+    MovieDetailsBatchRequestModel,
+    MovieDetailsBatchModel,
     MoviesListModel,
     MoviesPagedListModel,
     PageInfoModel,
+    MoviesCursorListModel,
+    MovieFilters,
+    MovieSort,
+    SortOrder,
+    MovieFacetsModel,
+    GenreFacetModel,
+    FacetValueModel,
 )
-from app.schemas.review import ReviewModel, ReviewShortModel, ReviewModifyModel
+from app.schemas.pagination import CursorPageInfoModel
+from app.schemas.review import ReviewModel, ReviewShortModel, ReviewModifyModel, ReviewsPagedListModel
 from app.schemas.token import TokenData
 
 __all__ = [
@@ -18,13 +30,26 @@ __all__ = [
     "UserShortModel",
     "Gender",
     "MovieElementModel",
+    "MovieSummaryModel",
+    "MovieListView",
     "MovieDetailsModel",
+    "MovieDetailsBatchRequestModel",
+    "MovieDetailsBatchModel",
     "MoviesListModel",
     "MoviesPagedListModel",
     "PageInfoModel",
+    "MoviesCursorListModel",
+    "MovieFilters",
+    "MovieSort",
+    "SortOrder",
+    "MovieFacetsModel",
+    "GenreFacetModel",
+    "FacetValueModel",
+    "CursorPageInfoModel",
     "ReviewModel",
     "ReviewShortModel",
     "ReviewModifyModel",
+    "ReviewsPagedListModel",
     "TokenData",
 ]
 
@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import List, Optional, Union
+from enum import Enum
 from uuid import UUID
 from app.schemas.review import ReviewModel
+from app.schemas.pagination import CursorPageInfoModel
 
 
 class GenreModel(BaseModel):
@@ -12,19 +14,57 @@ class GenreModel(BaseModel):
         from_attributes = True
 
 
-class MovieElementModel(BaseModel):
+class MovieListView(str, Enum):
+    Full = "full"
+    Summary = "summary"
+
+
+class MovieSort(str, Enum):
+    Created = "created"
+    Year = "year"
+    Name = "name"
+    Rating = "rating"
+
+
+class SortOrder(str, Enum):
+    Asc = "asc"
+    Desc = "desc"
+
+
+class MovieFilters(BaseModel):
+    """Catalog filters and sorting."""
+    genreId: Optional[UUID] = None
+    yearFrom: Optional[int] = None
+    yearTo: Optional[int] = None
+    country: Optional[str] = None
+    ageLimit: Optional[int] = None
+    sort: MovieSort = MovieSort.Created
+    order: SortOrder = SortOrder.Asc
+
+    def cache_key(self) -> str:
+        return ":".join(str(value) for value in self.model_dump(mode="json").values())
+
+
+class MovieSummaryModel(BaseModel):
     id: UUID
     name: str
     poster: str
     year: int
     country: str
     genres: List[GenreModel]
-    reviews: List["ReviewModel"]
+    ratingCount: int = 0
+    averageRating: Optional[float] = None
+    # Only present for authenticated callers
+    isFavorite: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
 
+class MovieElementModel(MovieSummaryModel):
+    reviews: List["ReviewModel"]
+
+
 class MovieDetailsModel(BaseModel):
     id: UUID
     name: str
@@ -33,6 +73,10 @@ class MovieDetailsModel(BaseModel):
     country: str
     genres: List[GenreModel]
     reviews: List["ReviewModel"]
+    reviewsNextCursor: Optional[str] = None
+    ratingCount: int = 0
+    averageRating: Optional[float] = None
+    ratingHistogram: List[int] = []
     time: int
     tagline: Optional[str] = None
     description: Optional[str] = None
@@ -40,13 +84,24 @@ class MovieDetailsModel(BaseModel):
     budget: Optional[int] = None
     fees: Optional[int] = None
     ageLimit: int
+    # Only present for authenticated callers
+    isFavorite: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
 
+class MovieDetailsBatchRequestModel(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1)
+
+
+class MovieDetailsBatchModel(BaseModel):
+    movies: List[MovieDetailsModel]
+    missingIds: List[UUID]
+
+
 class MoviesListModel(BaseModel):
-    movies: List[MovieElementModel]
+    movies: List[Union[MovieElementModel, MovieSummaryModel]]
 
 
 class PageInfoModel(BaseModel):
@@ -56,6 +111,29 @@ class PageInfoModel(BaseModel):
 
 
 class MoviesPagedListModel(BaseModel):
-    movies: List[MovieElementModel]
+    movies: List[Union[MovieElementModel, MovieSummaryModel]]
     pageInfo: PageInfoModel
 
+
+
+class MoviesCursorListModel(BaseModel):
+    movies: List[Union[MovieElementModel, MovieSummaryModel]]
+    pageInfo: CursorPageInfoModel
+
+
+class FacetValueModel(BaseModel):
+    value: str
+    count: int
+
+
+class GenreFacetModel(BaseModel):
+    id: UUID
+    name: str
+    count: int
+
+
+class MovieFacetsModel(BaseModel):
+    total: int
+    genres: List[GenreFacetModel]
+    years: List[FacetValueModel]
+    countries: List[FacetValueModel]
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class CursorPageInfoModel(BaseModel):
+    size: int
+    nextCursor: Optional[str] = None
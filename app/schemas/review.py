@@ -1,8 +1,9 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 from app.schemas.user import UserShortModel
+from app.schemas.pagination import CursorPageInfoModel
 
 
 class ReviewModifyModel(BaseModel):
@@ -30,3 +31,8 @@ class ReviewModel(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class ReviewsPagedListModel(BaseModel):
+    reviews: List[ReviewModel]
+    pageInfo: CursorPageInfoModel
@@ -4,5 +4,8 @@ from typing import Optional
 
 
 class TokenData(BaseModel):
+    """User identity taken from a verified access token."""
     user_id: Optional[UUID] = None
+    nickName: Optional[str] = None
+    avatar: Optional[str] = None
 
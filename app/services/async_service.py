@@ -0,0 +1,67 @@
+"""Run the services from async route handlers.
+
+Services are written against a sync ``Session``. With ``DATABASE_ASYNC``
+enabled, routes get an ``AsyncSession`` and the service runs through
+``AsyncSession.run_sync``: the same code executes on the event loop while
+asyncpg does the I/O, so a waiting request holds no thread. With a sync
+``Session`` the service runs in the threadpool as before.
+"""
+from datetime import datetime
+from typing import Callable, Optional, Tuple, TypeVar
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.dependencies import DbSession
+from app.schemas.movie import MovieFilters, MovieListView
+from app.services import movie_service
+from app.services.cache import catalog_cache, CATALOG_VERSION_KEY
+from app.utils.conditional import unpack_document
+from app.utils.serialization import dumps
+
+T = TypeVar("T")
+
+
+async def run_service(db: DbSession, service: Callable[..., T], *args) -> T:
+    """Call ``service(session, *args)`` without blocking the event loop."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(service, *args)
+    return await run_in_threadpool(service, db, *args)
+
+
+# Catalog pages are coalesced with a single-flight that waits on a thread event,
+# which must not happen on the event loop, so async sessions coalesce with
+# asyncio futures instead.
+
+async def get_movies_paged_document(
+    db: DbSession,
+    page: int,
+    page_size: int,
+    view: MovieListView,
+    filters: MovieFilters,
+) -> Tuple[bytes, str, Optional[datetime]]:
+    """Async variant of movie_service.get_movies_paged_document."""
+    if not isinstance(db, AsyncSession):
+        return await run_in_threadpool(movie_service.get_movies_paged_document, db, page, page_size, view, filters)
+    return unpack_document(await catalog_cache.get_or_load_async(
+        movie_service.paged_cache_key(page, page_size, view, filters),
+        lambda: db.run_sync(movie_service.movies_paged_entry, page, page_size, view, filters),
+        version_key=CATALOG_VERSION_KEY,
+    ))
+
+
+async def get_movies_by_cursor_json(
+    db: DbSession,
+    cursor: Optional[str],
+    page_size: int,
+    view: MovieListView,
+    filters: MovieFilters,
+) -> bytes:
+    """Async variant of movie_service.get_movies_by_cursor_json."""
+    if not isinstance(db, AsyncSession):
+        return await run_in_threadpool(movie_service.get_movies_by_cursor_json, db, cursor, page_size, view, filters)
+    return await catalog_cache.get_or_load_async(
+        movie_service.cursor_cache_key(cursor, page_size, view, filters),
+        lambda: db.run_sync(lambda session: dumps(
+            movie_service.get_movies_by_cursor(session, cursor, page_size, view, filters)
+        )),
+        version_key=CATALOG_VERSION_KEY,
+    )
@@ -1,91 +1,222 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
-from app.models.token import RefreshToken
+from app.models.token import RefreshToken, RevokedToken
 from app.schemas.auth import UserRegisterModel, LoginCredentials
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    hash_password,
+    verify_and_update_password,
     create_access_token,
     create_refresh_token,
+    decode_token,
+    token_digest,
     get_token_expire_time,
 )
 from app.core.exceptions import ConflictException, UnauthorizedException
+from app.services.read_routing import mark_written, user_scope
+from app.services.async_service import run_service
+from app.dependencies import DbSession
+from app.database import SessionLocal
+from app.utils.periodic import PeriodicTask
+from app.services.cache import principal_cache
+from app.services.token_revocation import revoked_token_filter
+from sqlalchemy import delete, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from app.utils.integrity import violated_constraint
+from datetime import datetime, timezone
+from app.config import settings
+from typing import Callable, Optional
 from uuid import UUID
 
 
-def register_user(db: Session, user_data: UserRegisterModel) -> dict:
-    """Register a new user."""
-    # Check if username already exists
-    existing_user = db.query(User).filter(User.username == user_data.userName).first()
-    if existing_user:
-        raise ConflictException("Username already registered")
-    
-    # Check if email already exists
-    existing_email = db.query(User).filter(User.email == user_data.email).first()
-    if existing_email:
-        raise ConflictException("Email already registered")
+def access_token_claims(user) -> dict:
+    """Claims of a user's access token; nickname and avatar may go stale until the token expires.
+
+    ``user`` is a User or a row with its id, username and avatar_link.
+    """
+    return {"sub": str(user.id), "nickName": user.username, "avatar": user.avatar_link}
+
+
+def is_access_token_revoked(payload: dict) -> bool:
+    """Whether the access token was revoked or issued before its user's last logout."""
+    if not settings.ACCESS_TOKEN_REVOCATION_CHECK:
+        return False
+    jti = payload.get("jti")
+    if jti and revoked_token_filter.is_revoked(jti):
+        return True
+    revoked_before = revoked_token_filter.revoked_before(payload["sub"])
+    return revoked_before is not None and payload.get("iat", 0) <= revoked_before
+
+
+def store_refresh_token(db: Session, user_id: UUID, token: str, prune: bool = True) -> None:
+    """Store a refresh token by digest, keeping at most REFRESH_TOKENS_PER_USER_MAX live tokens per user.
+
+    Unless ``prune`` is off, the user's expired tokens and the oldest ones
+    over the cap are deleted in the same transaction.
+    """
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=token_digest(token),
+        expires_at=get_token_expire_time("refresh"),
+    ))
+    if not prune:
+        return
+    db.flush()
     
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    over_cap = (
+        select(RefreshToken.id)
+        .where(RefreshToken.user_id == user_id)
+        .order_by(RefreshToken.created_at.desc(), RefreshToken.id.desc())
+        .offset(settings.REFRESH_TOKENS_PER_USER_MAX)
+    )
+    db.execute(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id == user_id)
+        .where(or_(RefreshToken.expires_at <= func.now(), RefreshToken.id.in_(over_cap)))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def purge_expired_refresh_tokens(db: Session, batch_size: int, should_stop: Callable[[], bool] = lambda: False) -> int:
+    """Delete expired refresh tokens in batches of ``batch_size``, committing each batch.
+
+    Short transactions keep locks and WAL bursts small on a large backlog.
+    """
+    deleted = 0
+    while not should_stop():
+        expired = select(RefreshToken.id).where(RefreshToken.expires_at <= func.now()).limit(batch_size)
+        result = db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(expired))
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            break
+    return deleted
+
+
+def _purge_expired_refresh_tokens() -> None:
+    with SessionLocal() as db:
+        purge_expired_refresh_tokens(db, settings.REFRESH_TOKEN_PURGE_BATCH_SIZE, lambda: refresh_token_purge.stopping)
+
+
+refresh_token_purge = PeriodicTask("refresh-token-purge", _purge_expired_refresh_tokens)
+
+
+async def register_user(db: DbSession, user_data: UserRegisterModel) -> dict:
+    """Register a new user, hashing the password off the request threads."""
+    password_hash = await hash_password(user_data.password)
+    return await run_service(db, create_user, user_data, password_hash)
+
+
+def create_user(db: Session, user_data: UserRegisterModel, password_hash: str) -> dict:
+    """Create a user with an already hashed password and issue their tokens.
+
+    The user and the refresh token are written in one transaction; the
+    unique indexes on username and email reject duplicates.
+    """
     new_user = User(
         username=user_data.userName,
         email=user_data.email,
         name=user_data.name,
-        password_hash=hashed_password,
+        password_hash=password_hash,
         birth_date=user_data.birthDate,
         gender=user_data.gender,
     )
-    
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        db.flush()
+    except IntegrityError as error:
+        db.rollback()
+        if violated_constraint(error) == "ix_users_username":
+            raise ConflictException("Username already registered")
+        if violated_constraint(error) == "ix_users_email":
+            raise ConflictException("Email already registered")
+        raise
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": str(new_user.id)})
+    access_token = create_access_token(data=access_token_claims(new_user))
     refresh_token = create_refresh_token(data={"sub": str(new_user.id)})
     
-    # Save refresh token to database
-    refresh_token_obj = RefreshToken(
-        user_id=new_user.id,
-        token=refresh_token,
-        expires_at=get_token_expire_time("refresh"),
-    )
-    db.add(refresh_token_obj)
+    # Save refresh token to database; a new user has no older tokens to prune
+    user_id = new_user.id
+    store_refresh_token(db, user_id, refresh_token, prune=False)
     db.commit()
+    # The new user reads their profile right away
+    mark_written(user_scope(user_id))
     
     return {"token": access_token}
 
 
-def login_user(db: Session, credentials: LoginCredentials) -> dict:
+async def login_user(db: DbSession, credentials: LoginCredentials) -> dict:
     """Authenticate user and return access token."""
-    # Find user by username
-    user = db.query(User).filter(User.username == credentials.username).first()
-    if not user:
+    user = await run_service(db, get_login_user, credentials.username)
+    
+    # Verify password off the request threads; no connection is held meanwhile
+    verified, new_password_hash = await verify_and_update_password(credentials.password, user.password_hash)
+    if not verified:
         raise UnauthorizedException("Invalid credentials")
     
-    # Verify password
-    if not verify_password(credentials.password, user.password_hash):
+    return await run_service(db, issue_login_tokens, user, new_password_hash)
+
+
+def get_login_user(db: Session, username: str) -> Row:
+    """Find the user logging in by username.
+
+    Returns a plain row (id, username, avatar_link, password_hash) and ends
+    the transaction, so the pooled connection is returned before the
+    password is verified.
+    """
+    user = db.execute(
+        select(User.id, User.username, User.avatar_link, User.password_hash).where(User.username == username)
+    ).first()
+    db.rollback()
+    if not user:
         raise UnauthorizedException("Invalid credentials")
+    return user
+
+
+def issue_login_tokens(db: Session, user: Row, new_password_hash: Optional[str] = None) -> dict:
+    """Issue tokens to a user authenticated with get_login_user.
+
+    ``new_password_hash`` replaces a stored hash with an outdated cost or scheme.
+    """
+    if new_password_hash is not None:
+        db.execute(update(User).where(User.id == user.id).values(password_hash=new_password_hash))
     
     # Generate tokens
-    access_token = create_access_token(data={"sub": str(user.id)})
+    access_token = create_access_token(data=access_token_claims(user))
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     # Save refresh token to database
-    refresh_token_obj = RefreshToken(
-        user_id=user.id,
-        token=refresh_token,
-        expires_at=get_token_expire_time("refresh"),
-    )
-    db.add(refresh_token_obj)
+    store_refresh_token(db, user.id, refresh_token)
     db.commit()
     
     return {"token": access_token}
 
 
 def logout_user(db: Session, user_id: UUID, token: str) -> None:
-    """Logout user by removing refresh token."""
+    """Logout user by removing refresh tokens and revoking issued access tokens."""
     # Remove all refresh tokens for this user (logout from all devices)
     db.query(RefreshToken).filter(RefreshToken.user_id == user_id).delete()
+    
+    # Revoke access tokens issued on other devices until they would have expired anyway
+    revoked_at = datetime.now(timezone.utc)
+    db.execute(update(User).where(User.id == user_id).values(tokens_revoked_before=revoked_at))
+    
+    # Revoke the presented access token by its ID
+    payload = decode_token(token) if token else None
+    if payload and payload.get("jti") and payload.get("exp"):
+        db.execute(
+            insert(RevokedToken)
+            .values(jti=payload["jti"], expires_at=datetime.fromtimestamp(payload["exp"], timezone.utc))
+            .on_conflict_do_nothing(index_elements=[RevokedToken.jti])
+        )
     db.commit()
-
+    principal_cache.invalidate(str(user_id))
+    revoked_token_filter.revoke_issued_before(str(user_id), revoked_at.timestamp())
+    if payload and payload.get("jti") and payload.get("exp"):
+        revoked_token_filter.add(payload["jti"], float(payload["exp"]))
@@ -0,0 +1,385 @@
+"""Read-through cache with pluggable backends.
+
+Values are stored as serialized bytes, so the same entries can live in the
+process (``MemoryCacheBackend``) or in an external store such as Redis
+(``RedisCacheBackend``). Entries are addressed by a version: writers bump
+the version instead of deleting entries, so a reader that loaded data
+before a write can never overwrite the fresh entry with a stale one.
+Several keys can share one version to be invalidated together.
+"""
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from sqlalchemy.util import await_only
+from app.config import settings
+
+
+class CacheBackend(ABC):
+    """Interface of a cache storage backend.
+
+    ``blocking`` backends wait on network round trips; the event loop calls
+    them from a worker thread (see ``Cache.get_or_load_async``).
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def get_counter(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-process backend with TTL expiry and LRU eviction.
+
+    Counters are evicted too (least recently used first, beyond
+    ``max_entries``). A key without a counter reads the counter floor,
+    which is raised past every evicted value, so a version never goes back
+    to one that cached entries may still be stored under. Raising the floor
+    only makes entries of the other keys without a counter unreachable.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: "OrderedDict[str, int]" = OrderedDict()
+        self._counter_floor = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key)
+            if value is None:
+                return self._counter_floor
+            self._counters.move_to_end(key)
+            return value
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = self._counters.get(key, self._counter_floor) + 1
+            self._counters[key] = value
+            self._counters.move_to_end(key)
+            while len(self._counters) > self.max_entries:
+                _, evicted = self._counters.popitem(last=False)
+                self._counter_floor = max(self._counter_floor, evicted + 1)
+            return value
+
+
+class RedisCacheBackend(CacheBackend):
+    """Out-of-process backend on top of a redis-py compatible client.
+
+    Any object implementing ``get``, ``set(..., ex=)``, ``delete`` and ``incr``
+    can be passed as the client, e.g. a local ``fakeredis.FakeRedis``.
+    Errors of the store are treated as cache misses.
+
+    Services run through ``AsyncSession.run_sync`` execute on the event loop;
+    there every round trip is awaited in a worker thread, so the loop keeps
+    serving other requests meanwhile.
+    """
+
+    blocking = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def _call(self, default: Any, method: Callable[..., Any], *args, **kwargs) -> Any:
+        def call():
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                return default
+        
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return call()
+        return await_only(asyncio.to_thread(call))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call(None, self.client.get, key)
+
+    def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._call(None, self.client.set, key, value, ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self._call(None, self.client.delete, key)
+
+    def get_counter(self, key: str) -> int:
+        return int(self._call(0, self.client.get, key) or 0)
+
+    def incr(self, key: str) -> int:
+        return int(self._call(0, self.client.incr, key))
+
+
+def create_cache_backend() -> CacheBackend:
+    """Create the backend selected by the CACHE_BACKEND setting."""
+    if settings.CACHE_BACKEND == "redis":
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        return RedisCacheBackend(redis.Redis.from_url(settings.CACHE_URL))
+    return MemoryCacheBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into a single execution."""
+
+    def __init__(self):
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, fn: Callable[[], bytes]) -> Tuple[bytes, bool]:
+        """Run fn once per key at a time; return its result and whether it was shared."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class _LeaderCancelled(Exception):
+    """The leading call was cancelled before fn finished."""
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines, followers await the leader's future.
+
+    When the leader is cancelled (e.g. its client disconnected), its
+    followers are not: they start over and one of them becomes the leader.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[bytes]]) -> Tuple[bytes, bool]:
+        """Await fn once per key at a time; return its result and whether it was shared."""
+        while True:
+            call = self._calls.get(key)
+            if call is None:
+                break
+            try:
+                return await asyncio.shield(call), True
+            except _LeaderCancelled:
+                continue
+        
+        call = self._calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            call.set_exception(_LeaderCancelled())
+            call.exception()
+            raise
+        except BaseException as e:
+            call.set_exception(e)
+            # Nobody may be waiting; mark the exception as retrieved
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result, False
+        finally:
+            del self._calls[key]
+
+
+class Cache:
+    """Versioned read-through cache over a backend, with hit/miss counters.
+
+    With ``single_flight`` enabled, concurrent misses of the same entry wait
+    for one loader call instead of all hitting the database. ``get_or_load``
+    waits on a thread event, so on the event loop (including loaders run via
+    ``AsyncSession.run_sync``) use ``get_or_load_async`` instead.
+    """
+
+    def __init__(self, backend: CacheBackend, namespace: str, ttl: int, single_flight: bool = False):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._single_flight = SingleFlight() if single_flight else None
+        self._async_single_flight = AsyncSingleFlight() if single_flight else None
+        self._lock = threading.Lock()
+
+    def _version_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}:version"
+
+    def _entry_key(self, key: str, version_key: str) -> str:
+        version = self.backend.get_counter(self._version_key(version_key))
+        return f"{self.namespace}:{key}:v{version}"
+
+    def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], bytes],
+        version_key: Optional[str] = None,
+    ) -> bytes:
+        """Return the cached value for key, loading and storing it on a miss.
+
+        The entry is versioned by ``version_key`` (the key itself by default).
+        """
+        entry_key = self._entry_key(key, version_key or key)
+        value = self.backend.get(entry_key)
+        if value is not None:
+            self._count("hits")
+            return value
+        
+        def load() -> bytes:
+            loaded = loader()
+            self.backend.set(entry_key, loaded, self.ttl)
+            return loaded
+        
+        if self._single_flight is None:
+            self._count("misses")
+            return load()
+        
+        value, shared = self._single_flight.do(entry_key, load)
+        self._count("coalesced" if shared else "misses")
+        return value
+
+    async def get_or_load_async(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[bytes]],
+        version_key: Optional[str] = None,
+    ) -> bytes:
+        """Async variant of get_or_load for coroutine loaders."""
+        entry_key = await self._call_backend(self._entry_key, key, version_key or key)
+        value = await self._call_backend(self.backend.get, entry_key)
+        if value is not None:
+            self._count("hits")
+            return value
+        
+        async def load() -> bytes:
+            loaded = await loader()
+            await self._call_backend(self.backend.set, entry_key, loaded, self.ttl)
+            return loaded
+        
+        if self._async_single_flight is None:
+            self._count("misses")
+            return await load()
+        
+        value, shared = await self._async_single_flight.do(entry_key, load)
+        self._count("coalesced" if shared else "misses")
+        return value
+
+    async def _call_backend(self, method: Callable[..., Any], *args) -> Any:
+        """Call a backend method from the event loop, in a worker thread if the backend blocks."""
+        if self.backend.blocking:
+            return await asyncio.to_thread(method, *args)
+        return method(*args)
+
+    def get_many(
+        self,
+        keys: List[str],
+        loader: Callable[[List[str]], Dict[str, bytes]],
+    ) -> Dict[str, bytes]:
+        """Return cached values of keys, loading all misses with one loader call.
+
+        Keys the loader does not return are left out of the result.
+        """
+        entry_keys = {key: self._entry_key(key, key) for key in keys}
+        values = {}
+        for key, entry_key in entry_keys.items():
+            value = self.backend.get(entry_key)
+            if value is not None:
+                values[key] = value
+        
+        missing = [key for key in keys if key not in values]
+        self._count("hits", len(values))
+        if missing:
+            self._count("misses", len(missing))
+            for key, value in loader(missing).items():
+                self.backend.set(entry_keys[key], value, self.ttl)
+                values[key] = value
+        return values
+
+    def invalidate(self, version_key: str) -> None:
+        """Make current entries of version_key unreachable by bumping its version."""
+        self.backend.incr(self._version_key(version_key))
+
+    def _count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced}
+
+
+cache_backend = create_cache_backend()
+
+# Serialized movie details with their validators, see pack_document
+movie_details_cache = Cache(cache_backend, "movie-details-document", settings.CACHE_TTL_SECONDS)
+
+# Serialized anonymous catalog pages (numbered pages with their validators), all sharing CATALOG_VERSION_KEY
+catalog_cache = Cache(cache_backend, "catalog", settings.CACHE_TTL_SECONDS, single_flight=True)
+CATALOG_VERSION_KEY = "pages"
+
+# Authenticated users (ProfileModel JSON) by user ID, see user_service.get_user_principal
+principal_cache = Cache(cache_backend, "principal", settings.PRINCIPAL_CACHE_TTL_SECONDS)
@@ -1,87 +1,113 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import any_, bindparam, delete, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID, insert
+from sqlalchemy.exc import IntegrityError
 from app.models.favorite import FavoriteMovie
 from app.models.movie import Movie
-from app.schemas.movie import MoviesListModel, MovieElementModel, GenreModel
-from app.schemas.review import ReviewModel
-from app.schemas.user import UserShortModel
-from app.core.exceptions import NotFoundException, ConflictException
+from app.services.movie_builder import MOVIE_ELEMENT_COLUMNS, build_movie_elements
+from app.schemas.movie import MovieListView
+from app.core.exceptions import NotFoundException, ConflictException, UnauthorizedException
+from app.services.read_routing import mark_written, user_scope
+from app.utils.integrity import violated_constraint
+from app.utils.pagination import encode_cursor, decode_cursor
+from datetime import datetime
+from typing import List, Optional, Set
 from uuid import UUID
 
 
-def get_favorite_movies(db: Session, user_id: UUID) -> MoviesListModel:
-    """Get list of user's favorite movies."""
-    favorites = db.query(FavoriteMovie).filter(FavoriteMovie.user_id == user_id).all()
+def get_favorite_movies(
+    db: Session,
+    user_id: UUID,
+    cursor: Optional[str] = None,
+    page_size: int = 20,
+    view: MovieListView = MovieListView.Full,
+) -> dict:
+    """Get a page of the user's favorite movies, most recently added first."""
+    query = (
+        db.query(*MOVIE_ELEMENT_COLUMNS, FavoriteMovie.created_at.label("favorited_at"))
+        .join(FavoriteMovie, FavoriteMovie.movie_id == Movie.id)
+        .filter(FavoriteMovie.user_id == user_id)
+        .order_by(FavoriteMovie.created_at.desc(), FavoriteMovie.movie_id.desc())
+    )
+    if cursor:
+        favorited_at, movie_id = decode_cursor(cursor, datetime, UUID)
+        query = query.filter(
+            tuple_(FavoriteMovie.created_at, FavoriteMovie.movie_id) < tuple_(favorited_at, movie_id)
+        )
     
-    movie_elements = []
-    for favorite in favorites:
-        movie = db.query(Movie).filter(Movie.id == favorite.movie_id).first()
-        if movie:
-            genres = [GenreModel(id=genre.id, name=genre.name) for genre in movie.genres]
-            reviews = []
-            for review in movie.reviews:
-                author = None
-                if not review.is_anonymous:
-                    author = UserShortModel(
-                        userId=review.user.id,
-                        nickName=review.user.username,
-                        avatar=review.user.avatar_link,
-                    )
-                reviews.append(
-                    ReviewModel(
-                        id=review.id,
-                        rating=review.rating,
-                        reviewText=review.review_text,
-                        isAnonymous=review.is_anonymous,
-                        createDateTime=review.created_at,
-                        author=author,
-                    )
-                )
-            
-            movie_elements.append(
-                MovieElementModel(
-                    id=movie.id,
-                    name=movie.name,
-                    poster=movie.poster,
-                    year=movie.year,
-                    country=movie.country,
-                    genres=genres,
-                    reviews=reviews,
-                )
-            )
+    # Fetch one extra row to find out whether there is a next page
+    rows = query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].favorited_at, rows[-1].id)
     
-    return MoviesListModel(movies=movie_elements)
+    movies = build_movie_elements(db, rows, view == MovieListView.Full)
+    for movie in movies:
+        movie["isFavorite"] = True
+    return {
+        "movies": movies,
+        "pageInfo": {"size": page_size, "nextCursor": next_cursor},
+    }
+
+
+def get_favorite_ids(db: Session, user_id: UUID, movie_ids: List[UUID]) -> Set[UUID]:
+    """Which of the given movies the user has in favorites, with one primary key lookup."""
+    if not movie_ids:
+        return set()
+    page_ids = bindparam("page_ids", list(movie_ids), type_=ARRAY(PG_UUID(as_uuid=True)))
+    return set(db.scalars(
+        select(FavoriteMovie.movie_id)
+        .where(FavoriteMovie.user_id == user_id, FavoriteMovie.movie_id == any_(page_ids))
+    ))
+
+
+def flag_favorites(db: Session, user_id: UUID, movies: List[dict]) -> List[str]:
+    """Set ``isFavorite`` on serialized movies (list elements or details).
+
+    Works on a copy of the shared cached payloads. Returns the sorted IDs of
+    the favorites among them, which identify the per-user variant for ETags.
+    """
+    favorite_ids = {str(movie_id) for movie_id in get_favorite_ids(db, user_id, [UUID(str(movie["id"])) for movie in movies])}
+    for movie in movies:
+        movie["isFavorite"] = str(movie["id"]) in favorite_ids
+    return sorted(favorite_ids)
 
 
 def add_favorite_movie(db: Session, user_id: UUID, movie_id: UUID) -> None:
-    """Add movie to favorites."""
-    # Check if movie exists
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
-    if not movie:
-        raise NotFoundException("Movie not found")
-    
-    # Check if already in favorites
-    existing = db.query(FavoriteMovie).filter(
-        FavoriteMovie.user_id == user_id,
-        FavoriteMovie.movie_id == movie_id
-    ).first()
-    if existing:
+    """Add movie to favorites in a single INSERT; constraints detect duplicates and missing movies."""
+    try:
+        added = db.execute(
+            insert(FavoriteMovie)
+            .values(user_id=user_id, movie_id=movie_id)
+            .on_conflict_do_nothing(index_elements=[FavoriteMovie.user_id, FavoriteMovie.movie_id])
+            .returning(FavoriteMovie.movie_id)
+        ).first()
+    except IntegrityError as error:
+        db.rollback()
+        if violated_constraint(error) == "fk_favorite_movies_movie_id":
+            raise NotFoundException("Movie not found")
+        if violated_constraint(error) == "fk_favorite_movies_user_id":
+            raise UnauthorizedException("User not found")
+        raise
+    if added is None:
+        db.rollback()
         raise ConflictException("Movie already in favorites")
     
-    # Add to favorites
-    favorite = FavoriteMovie(user_id=user_id, movie_id=movie_id)
-    db.add(favorite)
     db.commit()
+    mark_written(user_scope(user_id))
 
 
 def remove_favorite_movie(db: Session, user_id: UUID, movie_id: UUID) -> None:
-    """Remove movie from favorites."""
-    favorite = db.query(FavoriteMovie).filter(
-        FavoriteMovie.user_id == user_id,
-        FavoriteMovie.movie_id == movie_id
+    """Remove movie from favorites in a single DELETE."""
+    removed = db.execute(
+        delete(FavoriteMovie)
+        .where(FavoriteMovie.user_id == user_id, FavoriteMovie.movie_id == movie_id)
+        .returning(FavoriteMovie.movie_id)
     ).first()
-    if not favorite:
+    if removed is None:
+        db.rollback()
         raise NotFoundException("Movie not in favorites")
     
-    db.delete(favorite)
     db.commit()
-
+    mark_written(user_scope(user_id))
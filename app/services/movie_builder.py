@@ -0,0 +1,182 @@
+"""Build movie and review payloads straight from Core rows.
+
+Relationships are loaded with one query per kind for all movies at once and
+responses are assembled as plain dicts, which the routes return through
+ORJSONResponse instead of building and re-validating Pydantic models. The
+dict layouts match the schemas in app.schemas, which stay the documented
+response models.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from uuid import UUID
+from sqlalchemy import select, func, true
+from sqlalchemy.orm import Session
+from app.models.genre import Genre
+from app.models.movie import Movie, MovieGenre
+from app.models.review import Review
+from app.models.user import User
+
+MOVIE_ELEMENT_COLUMNS = (
+    Movie.id,
+    Movie.name,
+    Movie.poster,
+    Movie.year,
+    Movie.country,
+    Movie.rating_count,
+    Movie.rating_sum,
+)
+
+MOVIE_DETAILS_COLUMNS = MOVIE_ELEMENT_COLUMNS + (
+    Movie.rating_histogram,
+    Movie.time,
+    Movie.tagline,
+    Movie.description,
+    Movie.director,
+    Movie.budget,
+    Movie.fees,
+    Movie.age_limit,
+)
+
+REVIEW_COLUMNS = (
+    Review.movie_id,
+    Review.id,
+    Review.rating,
+    Review.review_text,
+    Review.is_anonymous,
+    Review.created_at,
+    User.id.label("author_id"),
+    User.username,
+    User.avatar_link,
+)
+
+
+def load_genres(db: Session, movie_ids: Iterable[UUID]) -> Dict[UUID, List[dict]]:
+    """Load genres of all given movies in one query, grouped by movie."""
+    rows = db.execute(
+        select(MovieGenre.movie_id, Genre.id, Genre.name)
+        .join(Genre, Genre.id == MovieGenre.genre_id)
+        .where(MovieGenre.movie_id.in_(list(movie_ids)))
+        .order_by(Genre.name)
+    )
+    genres = defaultdict(list)
+    for movie_id, genre_id, name in rows:
+        genres[movie_id].append({"id": genre_id, "name": name})
+    return genres
+
+
+def reviews_query():
+    """Select of review rows joined with their authors, newest first."""
+    return (
+        select(*REVIEW_COLUMNS)
+        .join(User, User.id == Review.user_id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+    )
+
+
+def load_review_rows(db: Session, movie_ids: Iterable[UUID]) -> list:
+    """Load all reviews of the given movies with their authors in one query."""
+    return db.execute(reviews_query().where(Review.movie_id.in_(list(movie_ids)))).all()
+
+
+def load_latest_review_rows(db: Session, movie_ids: Iterable[UUID], limit: int) -> list:
+    """Load up to ``limit`` newest reviews of each given movie in one query.
+
+    A LATERAL subquery per movie reads only the first ``limit`` entries of
+    ix_reviews_movie_id_created_at_id, however many reviews the movie has.
+    """
+    movies = select(Movie.id).where(Movie.id.in_(list(movie_ids))).subquery("requested_movies")
+    latest = (
+        select(Review.id)
+        .where(Review.movie_id == movies.c.id)
+        .order_by(Review.created_at.desc(), Review.id.desc())
+        .limit(limit)
+        .lateral("latest_reviews")
+    )
+    latest_ids = select(latest.c.id).select_from(movies).join(latest, true())
+    return db.execute(reviews_query().where(Review.id.in_(latest_ids))).all()
+
+
+def review_row_to_dict(row) -> dict:
+    """Convert a REVIEW_COLUMNS row to the ReviewModel layout."""
+    # Positional unpacking is several times faster than named row attributes
+    _, review_id, rating, review_text, is_anonymous, created_at, author_id, username, avatar_link = row
+    return {
+        "id": review_id,
+        "rating": rating,
+        "reviewText": review_text,
+        "isAnonymous": is_anonymous,
+        "createDateTime": created_at,
+        "author": None if is_anonymous else {
+            "userId": author_id,
+            "nickName": username,
+            "avatar": avatar_link,
+        },
+    }
+
+
+def group_reviews(rows) -> Dict[UUID, List[dict]]:
+    """Convert review rows to ReviewModel dicts grouped by movie."""
+    reviews = defaultdict(list)
+    for row in rows:
+        reviews[row[0]].append(review_row_to_dict(row))
+    return reviews
+
+
+def average_rating(rating_sum: int, rating_count: int) -> Optional[float]:
+    """Same as Movie.average_rating, computed from the selected aggregate columns."""
+    return rating_sum / rating_count if rating_count else None
+
+
+def movie_element(row, genres: List[dict], reviews: Optional[List[dict]] = None) -> dict:
+    """Convert a MOVIE_ELEMENT_COLUMNS row to the MovieSummaryModel/MovieElementModel layout."""
+    element = {
+        "id": row.id,
+        "name": row.name,
+        "poster": row.poster,
+        "year": row.year,
+        "country": row.country,
+        "genres": genres,
+        "ratingCount": row.rating_count,
+        "averageRating": average_rating(row.rating_sum, row.rating_count),
+    }
+    if reviews is not None:
+        element["reviews"] = reviews
+    return element
+
+
+def build_movie_elements(db: Session, rows: list, include_reviews: bool = True) -> List[dict]:
+    """Build list elements for movie rows with a constant number of queries."""
+    if not rows:
+        return []
+    
+    movie_ids = [row.id for row in rows]
+    genres = load_genres(db, movie_ids)
+    if not include_reviews:
+        return [movie_element(row, genres.get(row.id, [])) for row in rows]
+    
+    reviews = group_reviews(load_review_rows(db, movie_ids))
+    return [movie_element(row, genres.get(row.id, []), reviews.get(row.id, [])) for row in rows]
+
+
+def movie_details(row, genres: List[dict], reviews: List[dict], reviews_next_cursor: Optional[str]) -> dict:
+    """Convert a MOVIE_DETAILS_COLUMNS row to the MovieDetailsModel layout."""
+    return {
+        "id": row.id,
+        "name": row.name,
+        "poster": row.poster,
+        "year": row.year,
+        "country": row.country,
+        "genres": genres,
+        "reviews": reviews,
+        "reviewsNextCursor": reviews_next_cursor,
+        "ratingCount": row.rating_count,
+        "averageRating": average_rating(row.rating_sum, row.rating_count),
+        "ratingHistogram": row.rating_histogram,
+        "time": row.time,
+        "tagline": row.tagline,
+        "description": row.description,
+        "director": row.director,
+        "budget": row.budget,
+        "fees": row.fees,
+        "ageLimit": row.age_limit,
+    }
@@ -1,124 +1,338 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.movie import Movie
-from app.models.review import Review
+from sqlalchemy import func, tuple_, exists, distinct
+from app.models.movie import Movie, MovieGenre
+from app.models.genre import Genre
 from app.schemas.movie import (
-    MovieElementModel,
-    MovieDetailsModel,
-    MoviesPagedListModel,
-    PageInfoModel,
-    GenreModel,
+    MovieListView,
+    MovieFilters,
+    MovieSort,
+    SortOrder,
+    MovieFacetsModel,
+    GenreFacetModel,
+    FacetValueModel,
 )
-from app.schemas.review import ReviewModel
-from app.schemas.user import UserShortModel
-from app.core.exceptions import NotFoundException
+from app.services.movie_builder import (
+    MOVIE_ELEMENT_COLUMNS,
+    MOVIE_DETAILS_COLUMNS,
+    build_movie_elements,
+    load_genres,
+    load_latest_review_rows,
+    review_row_to_dict,
+    movie_details,
+)
+from app.services.cache import movie_details_cache, catalog_cache, CATALOG_VERSION_KEY
+from app.core.exceptions import NotFoundException, BadRequestException
+from app.config import settings
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.conditional import pack_document, unpack_document
+from datetime import datetime
 from uuid import UUID
-from typing import List
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+import orjson
+from app.utils.serialization import dumps
+
+
+def _catalog_query(db: Session, filters: MovieFilters, *entities):
+    """Query of catalog movies (or the given columns) matching the filters."""
+    query = db.query(*(entities or (Movie,))).select_from(Movie)
+    if filters.genreId is not None:
+        query = query.filter(
+            exists()
+            .where(MovieGenre.movie_id == Movie.id, MovieGenre.genre_id == filters.genreId)
+            .correlate(Movie)
+        )
+    if filters.yearFrom is not None:
+        query = query.filter(Movie.year >= filters.yearFrom)
+    if filters.yearTo is not None:
+        query = query.filter(Movie.year <= filters.yearTo)
+    if filters.country is not None:
+        query = query.filter(Movie.country == filters.country)
+    if filters.ageLimit is not None:
+        query = query.filter(Movie.age_limit <= filters.ageLimit)
+    return query
+
+
+# Keyset columns of each catalog sort, the movie id breaks ties
+SORT_KEYS = {
+    MovieSort.Created: ((Movie.created_at, datetime), (Movie.id, UUID)),
+    MovieSort.Year: ((Movie.year, int), (Movie.id, UUID)),
+    MovieSort.Name: ((Movie.name, str), (Movie.id, UUID)),
+    MovieSort.Rating: ((Movie.rating_sort_key, float), (Movie.id, UUID)),
+}
+
 
+def _order_by(filters: MovieFilters) -> list:
+    columns = [column for column, _ in SORT_KEYS[filters.sort]]
+    if filters.order == SortOrder.Desc:
+        return [column.desc() for column in columns]
+    return columns
 
-def get_movies_paged(db: Session, page: int = 1, page_size: int = 6) -> MoviesPagedListModel:
+
+def get_movies_paged(
+    db: Session,
+    page: int = 1,
+    page_size: int = 6,
+    view: MovieListView = MovieListView.Full,
+    filters: Optional[MovieFilters] = None,
+) -> dict:
     """Get paginated list of movies."""
+    return _load_movies_paged(db, page, page_size, view, filters)[0]
+
+
+def _load_movies_paged(
+    db: Session,
+    page: int,
+    page_size: int,
+    view: MovieListView,
+    filters: Optional[MovieFilters],
+) -> Tuple[dict, Optional[datetime]]:
+    """Load a catalog page and the last modification time of the movies matching the filters."""
+    filters = filters or MovieFilters()
+    
     # Calculate offset
     offset = (page - 1) * page_size
     
     # Get total count
-    total_count = db.query(func.count(Movie.id)).scalar()
+    total_count, last_modified = _catalog_query(
+        db, filters, func.count(Movie.id), func.max(Movie.updated_at)
+    ).one()
     
     # Calculate total pages
     total_pages = (total_count + page_size - 1) // page_size
     
     # Get movies
-    movies = db.query(Movie).offset(offset).limit(page_size).all()
-    
-    # Convert to response model
-    movie_elements = []
-    for movie in movies:
-        genres = [GenreModel(id=genre.id, name=genre.name) for genre in movie.genres]
-        reviews = []
-        for review in movie.reviews:
-            author = None
-            if not review.is_anonymous:
-                author = UserShortModel(
-                    userId=review.user.id,
-                    nickName=review.user.username,
-                    avatar=review.user.avatar_link,
-                )
-            reviews.append(
-                ReviewModel(
-                    id=review.id,
-                    rating=review.rating,
-                    reviewText=review.review_text,
-                    isAnonymous=review.is_anonymous,
-                    createDateTime=review.created_at,
-                    author=author,
-                )
-            )
-        
-        movie_elements.append(
-            MovieElementModel(
-                id=movie.id,
-                name=movie.name,
-                poster=movie.poster,
-                year=movie.year,
-                country=movie.country,
-                genres=genres,
-                reviews=reviews,
-            )
-        )
-    
-    page_info = PageInfoModel(
-        size=page_size,
-        count=total_pages,
-        current=page,
+    rows = (
+        _catalog_query(db, filters, *MOVIE_ELEMENT_COLUMNS)
+        .order_by(*_order_by(filters))
+        .offset(offset)
+        .limit(page_size)
+        .all()
     )
     
-    return MoviesPagedListModel(movies=movie_elements, pageInfo=page_info)
+    return {
+        "movies": build_movie_elements(db, rows, view == MovieListView.Full),
+        "pageInfo": {"size": page_size, "count": total_pages, "current": page},
+    }, last_modified
 
 
-def get_movie_details(db: Session, movie_id: UUID) -> MovieDetailsModel:
-    """Get detailed information about a movie."""
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
-    if not movie:
-        raise NotFoundException("Movie not found")
+def get_movies_by_cursor(
+    db: Session,
+    cursor: Optional[str] = None,
+    page_size: int = 6,
+    view: MovieListView = MovieListView.Full,
+    filters: Optional[MovieFilters] = None,
+) -> dict:
+    """Get a page of movies after the given cursor, in the requested sort order."""
+    filters = filters or MovieFilters()
+    sort_keys = SORT_KEYS[filters.sort]
+    columns = [column for column, _ in sort_keys]
+    
+    # Keyset columns that are not part of the element are selected as extras
+    element_keys = {column.key for column in MOVIE_ELEMENT_COLUMNS}
+    extra_columns = [column for column in columns if column.key not in element_keys]
+    query = (
+        _catalog_query(db, filters, *MOVIE_ELEMENT_COLUMNS, *extra_columns)
+        .order_by(*_order_by(filters))
+    )
+    if cursor:
+        values = decode_cursor(cursor, *(value_type for _, value_type in sort_keys))
+        if filters.order == SortOrder.Desc:
+            query = query.filter(tuple_(*columns) < tuple_(*values))
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+    
+    # Fetch one extra row to find out whether there is a next page
+    rows = query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(*(getattr(last, column.key) for column in columns))
     
-    # Convert genres
-    genres = [GenreModel(id=genre.id, name=genre.name) for genre in movie.genres]
-    
-    # Convert reviews
-    reviews = []
-    for review in movie.reviews:
-        author = None
-        if not review.is_anonymous:
-            author = UserShortModel(
-                userId=review.user.id,
-                nickName=review.user.username,
-                avatar=review.user.avatar_link,
-            )
-        reviews.append(
-            ReviewModel(
-                id=review.id,
-                rating=review.rating,
-                reviewText=review.review_text,
-                isAnonymous=review.is_anonymous,
-                createDateTime=review.created_at,
-                author=author,
-            )
+    return {
+        "movies": build_movie_elements(db, rows, view == MovieListView.Full),
+        "pageInfo": {"size": page_size, "nextCursor": next_cursor},
+    }
+
+
+def get_movie_facets(db: Session, filters: Optional[MovieFilters] = None) -> MovieFacetsModel:
+    """Count movies per genre, year and country for the filters in one aggregate query."""
+    filters = filters or MovieFilters()
+    movie_count = func.count(distinct(Movie.id))
+    rows = (
+        _catalog_query(
+            db,
+            filters,
+            Genre.id,
+            Genre.name,
+            Movie.year,
+            Movie.country,
+            movie_count,
+            func.grouping(Genre.id, Genre.name, Movie.year, Movie.country),
         )
+        .outerjoin(MovieGenre, MovieGenre.movie_id == Movie.id)
+        .outerjoin(Genre, Genre.id == MovieGenre.genre_id)
+        .group_by(func.grouping_sets(
+            tuple_(Genre.id, Genre.name),
+            tuple_(Movie.year),
+            tuple_(Movie.country),
+            tuple_(),
+        ))
+        .all()
+    )
     
-    return MovieDetailsModel(
-        id=movie.id,
-        name=movie.name,
-        poster=movie.poster,
-        year=movie.year,
-        country=movie.country,
-        genres=genres,
-        reviews=reviews,
-        time=movie.time,
-        tagline=movie.tagline,
-        description=movie.description,
-        director=movie.director,
-        budget=movie.budget,
-        fees=movie.fees,
-        ageLimit=movie.age_limit,
+    # grouping() sets a bit for every column not in the row's grouping set
+    facets = MovieFacetsModel(total=0, genres=[], years=[], countries=[])
+    for genre_id, genre_name, year, country, count, grouping in rows:
+        if grouping == 0b0011:
+            if genre_id is not None:
+                facets.genres.append(GenreFacetModel(id=genre_id, name=genre_name, count=count))
+        elif grouping == 0b1101:
+            facets.years.append(FacetValueModel(value=str(year), count=count))
+        elif grouping == 0b1110:
+            facets.countries.append(FacetValueModel(value=country, count=count))
+        else:
+            facets.total = count
+    
+    facets.genres.sort(key=lambda facet: facet.name)
+    facets.years.sort(key=lambda facet: facet.value)
+    facets.countries.sort(key=lambda facet: facet.value)
+    return facets
+
+
+def paged_cache_key(page: int, page_size: int, view: MovieListView, filters: MovieFilters) -> str:
+    return f"paged-document:{page}:{page_size}:{view.value}:{filters.cache_key()}"
+
+
+def cursor_cache_key(cursor: Optional[str], page_size: int, view: MovieListView, filters: MovieFilters) -> str:
+    return f"cursor:{cursor or ''}:{page_size}:{view.value}:{filters.cache_key()}"
+
+
+def movies_paged_entry(
+    db: Session,
+    page: int,
+    page_size: int,
+    view: MovieListView,
+    filters: MovieFilters,
+) -> bytes:
+    """Cache entry of a catalog page with its validators, see pack_document."""
+    movies_page, last_modified = _load_movies_paged(db, page, page_size, view, filters)
+    return pack_document(dumps(movies_page), last_modified)
+
+
+def get_movies_paged_document(
+    db: Session,
+    page: int = 1,
+    page_size: int = 6,
+    view: MovieListView = MovieListView.Full,
+    filters: Optional[MovieFilters] = None,
+) -> Tuple[bytes, str, Optional[datetime]]:
+    """Get a serialized catalog page with its ETag and Last-Modified, served from the response cache."""
+    filters = filters or MovieFilters()
+    return unpack_document(catalog_cache.get_or_load(
+        paged_cache_key(page, page_size, view, filters),
+        lambda: movies_paged_entry(db, page, page_size, view, filters),
+        version_key=CATALOG_VERSION_KEY,
+    ))
+
+
+def get_movies_by_cursor_json(
+    db: Session,
+    cursor: Optional[str] = None,
+    page_size: int = 6,
+    view: MovieListView = MovieListView.Full,
+    filters: Optional[MovieFilters] = None,
+) -> bytes:
+    """Get a serialized cursor page of the catalog, served from the response cache."""
+    filters = filters or MovieFilters()
+    return catalog_cache.get_or_load(
+        cursor_cache_key(cursor, page_size, view, filters),
+        lambda: dumps(get_movies_by_cursor(db, cursor, page_size, view, filters)),
+        version_key=CATALOG_VERSION_KEY,
     )
 
+
+def _movie_details_entry(details: dict, last_modified: Optional[datetime]) -> bytes:
+    return pack_document(dumps(details), last_modified)
+
+
+def get_movie_details_document(db: Session, movie_id: UUID) -> Tuple[bytes, str, Optional[datetime]]:
+    """Get serialized movie details with their ETag and Last-Modified, reading through the cache."""
+    return unpack_document(movie_details_cache.get_or_load(
+        str(movie_id),
+        lambda: _movie_details_entry(*_load_movie_details(db, movie_id)),
+    ))
+
+
+def get_movie_details(db: Session, movie_id: UUID) -> dict:
+    """Get detailed information about a movie, reading through the cache."""
+    return orjson.loads(get_movie_details_document(db, movie_id)[0])
+
+
+def get_movie_details_batch_json(db: Session, movie_ids: List[UUID]) -> bytes:
+    """Get serialized details of several movies in request order, reading through the cache.
+
+    Movies that do not exist are listed in ``missingIds`` instead of failing the batch.
+    """
+    if len(movie_ids) > settings.MOVIE_DETAILS_BATCH_MAX_SIZE:
+        raise BadRequestException(
+            f"At most {settings.MOVIE_DETAILS_BATCH_MAX_SIZE} movies can be requested at once"
+        )
+    
+    keys = [str(movie_id) for movie_id in dict.fromkeys(movie_ids)]
+    
+    def load(missing_keys: List[str]) -> Dict[str, bytes]:
+        details = _load_movie_details_batch(db, [UUID(key) for key in missing_keys])
+        return {str(movie_id): _movie_details_entry(*loaded) for movie_id, loaded in details.items()}
+    
+    cached = movie_details_cache.get_many(keys, load)
+    
+    # Splice the cached documents instead of parsing and re-serializing them
+    return b"".join((
+        b'{"movies":[',
+        b",".join(unpack_document(cached[key])[0] for key in keys if key in cached),
+        b'],"missingIds":',
+        dumps([key for key in keys if key not in cached]),
+        b"}",
+    ))
+
+
+def _load_movie_details(db: Session, movie_id: UUID) -> Tuple[dict, Optional[datetime]]:
+    """Load detailed information about a movie with its newest reviews, and its last modification time."""
+    details = _load_movie_details_batch(db, [movie_id])
+    if movie_id not in details:
+        raise NotFoundException("Movie not found")
+    return details[movie_id]
+
+
+def _load_movie_details_batch(db: Session, movie_ids: List[UUID]) -> Dict[UUID, Tuple[dict, Optional[datetime]]]:
+    """Load details of existing movies among movie_ids, with their last modification time, in three queries."""
+    rows = db.query(*MOVIE_DETAILS_COLUMNS, Movie.updated_at).filter(Movie.id.in_(movie_ids)).all()
+    if not rows:
+        return {}
+    
+    found_ids = [row.id for row in rows]
+    genres = load_genres(db, found_ids)
+    
+    # Embed only the newest reviews, the rest are paged via /api/movie/{id}/reviews;
+    # one extra review per movie tells whether there is a next page
+    limit = settings.MOVIE_DETAILS_REVIEWS_LIMIT
+    review_rows = defaultdict(list)
+    for review_row in load_latest_review_rows(db, found_ids, limit + 1):
+        review_rows[review_row[0]].append(review_row)
+    
+    details = {}
+    for row in rows:
+        reviews = review_rows.get(row.id, [])
+        next_cursor = None
+        if len(reviews) > limit:
+            reviews = reviews[:limit]
+            next_cursor = encode_cursor(reviews[-1].created_at, reviews[-1].id)
+        details[row.id] = movie_details(
+            row,
+            genres.get(row.id, []),
+            [review_row_to_dict(review) for review in reviews],
+            next_cursor,
+        ), row.updated_at
+    return details
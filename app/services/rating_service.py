@@ -0,0 +1,92 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select, update
+from app.models.movie import Movie, empty_rating_histogram
+from app.models.review import Review
+from typing import List
+from uuid import UUID
+
+
+def _update_movie(db: Session, movie_id: UUID, values: dict) -> None:
+    # Every review change also bumps the movie version (and updated_at)
+    db.execute(
+        update(Movie)
+        .where(Movie.id == movie_id)
+        .values({**values, Movie.version: Movie.version + 1})
+        .execution_options(synchronize_session=False)
+    )
+
+
+def record_rating(db: Session, movie_id: UUID, rating: int) -> None:
+    """Add a new review rating to the movie aggregates."""
+    _update_movie(db, movie_id, {
+        Movie.rating_count: Movie.rating_count + 1,
+        Movie.rating_sum: Movie.rating_sum + rating,
+        Movie.rating_histogram[rating]: Movie.rating_histogram[rating] + 1,
+    })
+
+
+def change_rating(db: Session, movie_id: UUID, old_rating: int, new_rating: int) -> None:
+    """Move an edited review from one rating bucket to another."""
+    if old_rating == new_rating:
+        _update_movie(db, movie_id, {})
+        return
+    _update_movie(db, movie_id, {
+        Movie.rating_sum: Movie.rating_sum + (new_rating - old_rating),
+        Movie.rating_histogram[old_rating]: Movie.rating_histogram[old_rating] - 1,
+        Movie.rating_histogram[new_rating]: Movie.rating_histogram[new_rating] + 1,
+    })
+
+
+def remove_rating(db: Session, movie_id: UUID, rating: int) -> None:
+    """Remove a deleted review rating from the movie aggregates."""
+    _update_movie(db, movie_id, {
+        Movie.rating_count: Movie.rating_count - 1,
+        Movie.rating_sum: Movie.rating_sum - rating,
+        Movie.rating_histogram[rating]: Movie.rating_histogram[rating] - 1,
+    })
+
+
+def recompute_rating_aggregates(db: Session) -> List[UUID]:
+    """Recompute rating aggregates of all movies from the reviews table.
+
+    The movie rows are locked before the reviews are counted: review writes
+    update their movie's aggregates in the same transaction as the review,
+    so each one is either committed and counted or waits for the lock and
+    applies its change on top of the recomputed values.
+
+    Returns the recomputed movie IDs; their caches should be invalidated after commit.
+    """
+    movie_ids = db.scalars(select(Movie.id).order_by(Movie.id).with_for_update()).all()
+    rows = (
+        db.query(Review.movie_id, Review.rating, func.count(Review.id))
+        .group_by(Review.movie_id, Review.rating)
+        .all()
+    )
+    
+    aggregates = {
+        movie_id: {
+            "id": movie_id,
+            "rating_count": 0,
+            "rating_sum": 0,
+            "rating_histogram": empty_rating_histogram(),
+        }
+        for movie_id in movie_ids
+    }
+    for movie_id, rating, count in rows:
+        aggregate = aggregates.get(movie_id)
+        if aggregate is None:
+            # Movie created after the rows were locked
+            continue
+        aggregate["rating_count"] += count
+        aggregate["rating_sum"] += rating * count
+        aggregate["rating_histogram"][rating] += count
+    
+    if aggregates:
+        db.execute(update(Movie), list(aggregates.values()))
+        db.execute(
+            update(Movie)
+            .values(version=Movie.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return list(aggregates)
@@ -0,0 +1,109 @@
+"""Read-your-own-writes on top of replica routing.
+
+Writers mark the scopes they changed (a user, a movie, the catalog) for
+``DB_REPLICA_STICKY_SECONDS``. Reads of a marked scope go to the primary
+until replicas have caught up, so users see their own changes and shared
+response caches are never refilled from a lagging replica.
+
+With the Redis cache backend the marks are plain Redis keys with a TTL.
+Otherwise they are kept per worker process in ``ExpiringMarks``, not in the
+memory cache backend, whose LRU could evict a mark before it expires.
+"""
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Union
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.services.cache import cache_backend, RedisCacheBackend
+
+CATALOG_SCOPE = "catalog"
+
+
+class ExpiringMarks:
+    """In-process marks that are only ever dropped once expired.
+
+    All marks share one TTL, so in insertion order (a mark set again moves to
+    the end) the oldest mark is always the next to expire: expired marks are
+    pruned from the front on every write, which bounds the map by the marks
+    set within the last TTL.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._expires: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            expires = self._expires.get(key)
+        return expires is not None and expires > time.monotonic()
+
+    def add(self, key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._expires[key] = now + self.ttl
+            self._expires.move_to_end(key)
+            while self._expires and next(iter(self._expires.values())) <= now:
+                self._expires.popitem(last=False)
+
+
+# None when the marks are kept in Redis
+_local_marks: Optional[ExpiringMarks] = (
+    None if isinstance(cache_backend, RedisCacheBackend) else ExpiringMarks(settings.DB_REPLICA_STICKY_SECONDS)
+)
+
+
+def user_scope(user_id: UUID) -> str:
+    return f"user:{user_id}"
+
+
+def movie_scope(movie_id: UUID) -> str:
+    return f"movie:{movie_id}"
+
+
+def _sticky_key(scope: str) -> str:
+    return f"read-primary:{scope}"
+
+
+def _set_mark(scope: str) -> None:
+    if _local_marks is None:
+        cache_backend.set(_sticky_key(scope), b"1", settings.DB_REPLICA_STICKY_SECONDS)
+    else:
+        _local_marks.add(_sticky_key(scope))
+
+
+def _is_marked(scope: str) -> bool:
+    if _local_marks is None:
+        return cache_backend.get(_sticky_key(scope)) is not None
+    return _sticky_key(scope) in _local_marks
+
+
+def mark_written(*scopes: str) -> None:
+    """Send reads of the scopes to the primary for the next DB_REPLICA_STICKY_SECONDS."""
+    if not settings.DATABASE_REPLICA_URLS:
+        return
+    for scope in scopes:
+        _set_mark(scope)
+
+
+def recently_written(*scopes: str) -> bool:
+    if not settings.DATABASE_REPLICA_URLS:
+        return False
+    return any(_is_marked(scope) for scope in scopes)
+
+
+async def recently_written_async(*scopes: str) -> bool:
+    """recently_written for the event loop, asking Redis from a worker thread."""
+    if not settings.DATABASE_REPLICA_URLS or _local_marks is not None:
+        return recently_written(*scopes)
+    return await asyncio.to_thread(recently_written, *scopes)
+
+
+async def pin_primary_after_write(db: Union[Session, AsyncSession], *scopes: str) -> None:
+    """Send the rest of the request's reads to the primary if any scope was recently written."""
+    if db.info.get("replica") is not None and await recently_written_async(*scopes):
+        db.info["primary"] = True
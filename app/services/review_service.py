@@ -1,36 +1,130 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import delete, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from app.models.review import Review
 from app.models.movie import Movie
 from app.schemas.review import ReviewModifyModel
-from app.core.exceptions import NotFoundException, ConflictException, ForbiddenException
+from app.core.exceptions import NotFoundException, ConflictException, ForbiddenException, UnauthorizedException
+from app.services.rating_service import record_rating, change_rating, remove_rating
+from app.services.cache import movie_details_cache, catalog_cache, CATALOG_VERSION_KEY
+from app.services.movie_builder import reviews_query, review_row_to_dict
+from app.services.read_routing import mark_written, movie_scope, user_scope, CATALOG_SCOPE
+from app.utils.pagination import encode_cursor, decode_cursor
+from app.utils.integrity import violated_constraint
+from datetime import datetime
+from typing import List, Optional
 from uuid import UUID
 
 
-def add_review(db: Session, user_id: UUID, movie_id: UUID, review_data: ReviewModifyModel) -> None:
-    """Add a review to a movie."""
-    # Check if movie exists
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
-    if not movie:
-        raise NotFoundException("Movie not found")
+def invalidate_movie_caches(*movie_ids: UUID) -> None:
+    """Drop cached details of the given movies and all cached catalog pages.
+
+    Until replicas catch up, the caches are refilled from the primary.
+    """
+    mark_written(CATALOG_SCOPE, *(movie_scope(movie_id) for movie_id in movie_ids))
+    for movie_id in movie_ids:
+        movie_details_cache.invalidate(str(movie_id))
+    catalog_cache.invalidate(CATALOG_VERSION_KEY)
+
+
+def touch_movies_reviewed_by(db: Session, user_id: UUID) -> List[UUID]:
+    """Mark movies with the user's public reviews as modified (e.g. after an avatar change).
+
+    Returns the touched movie IDs; their caches should be invalidated after commit.
+    """
+    movie_ids = [
+        movie_id for (movie_id,) in db.query(Review.movie_id).filter(
+            Review.user_id == user_id,
+            Review.is_anonymous.is_(False),
+        )
+    ]
+    if movie_ids:
+        db.execute(
+            update(Movie)
+            .where(Movie.id.in_(movie_ids))
+            .values(version=Movie.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+    return movie_ids
+
+
+def get_movie_reviews(
+    db: Session,
+    movie_id: UUID,
+    cursor: Optional[str] = None,
+    page_size: int = 10,
+) -> dict:
+    """Get a page of movie reviews, newest first."""
+    query = reviews_query().where(Review.movie_id == movie_id)
+    if cursor:
+        created_at, review_id = decode_cursor(cursor, datetime, UUID)
+        query = query.where(tuple_(Review.created_at, Review.id) < tuple_(created_at, review_id))
     
-    # Check if user already reviewed this movie
-    existing_review = db.query(Review).filter(
-        Review.user_id == user_id,
-        Review.movie_id == movie_id
-    ).first()
-    if existing_review:
+    # Fetch one extra row to find out whether there is a next page
+    rows = db.execute(query.limit(page_size + 1)).all()
+    if not rows and not cursor:
+        if db.query(Movie.id).filter(Movie.id == movie_id).first() is None:
+            raise NotFoundException("Movie not found")
+    
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    
+    return {
+        "reviews": [review_row_to_dict(row) for row in rows],
+        "pageInfo": {"size": page_size, "nextCursor": next_cursor},
+    }
+
+
+def add_review(db: Session, user_id: UUID, movie_id: UUID, review_data: ReviewModifyModel) -> None:
+    """Add a review to a movie.
+
+    The unique (user_id, movie_id) index rejects a second review and the
+    foreign key a missing movie, so no lookups precede the INSERT.
+    """
+    try:
+        added = db.execute(
+            insert(Review)
+            .values(
+                movie_id=movie_id,
+                user_id=user_id,
+                rating=review_data.rating,
+                review_text=review_data.reviewText,
+                is_anonymous=review_data.isAnonymous,
+            )
+            .on_conflict_do_nothing(index_elements=[Review.user_id, Review.movie_id])
+            .returning(Review.id)
+        ).first()
+    except IntegrityError as error:
+        db.rollback()
+        if violated_constraint(error) == "fk_reviews_movie_id":
+            raise NotFoundException("Movie not found")
+        if violated_constraint(error) == "fk_reviews_user_id":
+            raise UnauthorizedException("User not found")
+        raise
+    if added is None:
+        db.rollback()
         raise ConflictException("You have already reviewed this movie")
     
-    # Create review
-    review = Review(
-        movie_id=movie_id,
-        user_id=user_id,
-        rating=review_data.rating,
-        review_text=review_data.reviewText,
-        is_anonymous=review_data.isAnonymous,
-    )
-    db.add(review)
+    record_rating(db, movie_id, review_data.rating)
     db.commit()
+    mark_written(user_scope(user_id))
+    invalidate_movie_caches(movie_id)
+
+
+def _raise_review_not_modifiable(db: Session, user_id: UUID, movie_id: UUID, review_id: UUID, action: str) -> None:
+    """Explain why a conditional UPDATE/DELETE of a review matched no row."""
+    db.rollback()
+    review = db.execute(select(Review.movie_id, Review.user_id).where(Review.id == review_id)).first()
+    if review is None:
+        raise NotFoundException("Review not found")
+    if review.movie_id != movie_id:
+        raise NotFoundException("Review not found for this movie")
+    if review.user_id != user_id:
+        raise ForbiddenException(f"You can only {action} your own reviews")
+    raise NotFoundException("Review not found")
 
 
 def edit_review(
@@ -40,43 +134,46 @@ def edit_review(
     review_id: UUID,
     review_data: ReviewModifyModel
 ) -> None:
-    """Edit a review."""
-    # Get review
-    review = db.query(Review).filter(Review.id == review_id).first()
-    if not review:
-        raise NotFoundException("Review not found")
-    
-    # Check if review belongs to the movie
-    if review.movie_id != movie_id:
-        raise NotFoundException("Review not found for this movie")
-    
-    # Check if user is the author
-    if review.user_id != user_id:
-        raise ForbiddenException("You can only edit your own reviews")
-    
-    # Update review
-    review.rating = review_data.rating
-    review.review_text = review_data.reviewText
-    review.is_anonymous = review_data.isAnonymous
+    """Edit a review with one conditional UPDATE that also returns the old rating."""
+    # Lock the row in the subquery, so the old rating is the one being replaced
+    old = (
+        select(Review.id, Review.rating)
+        .where(Review.id == review_id, Review.movie_id == movie_id, Review.user_id == user_id)
+        .with_for_update()
+        .subquery()
+    )
+    edited = db.execute(
+        update(Review)
+        .where(Review.id == old.c.id)
+        .values(
+            rating=review_data.rating,
+            review_text=review_data.reviewText,
+            is_anonymous=review_data.isAnonymous,
+        )
+        .returning(old.c.rating)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if edited is None:
+        _raise_review_not_modifiable(db, user_id, movie_id, review_id, "edit")
     
+    change_rating(db, movie_id, edited.rating, review_data.rating)
     db.commit()
+    mark_written(user_scope(user_id))
+    invalidate_movie_caches(movie_id)
 
 
 def delete_review(db: Session, user_id: UUID, movie_id: UUID, review_id: UUID) -> None:
-    """Delete a review."""
-    # Get review
-    review = db.query(Review).filter(Review.id == review_id).first()
-    if not review:
-        raise NotFoundException("Review not found")
-    
-    # Check if review belongs to the movie
-    if review.movie_id != movie_id:
-        raise NotFoundException("Review not found for this movie")
-    
-    # Check if user is the author
-    if review.user_id != user_id:
-        raise ForbiddenException("You can only delete your own reviews")
+    """Delete a review with one conditional DELETE that returns its rating."""
+    deleted = db.execute(
+        delete(Review)
+        .where(Review.id == review_id, Review.movie_id == movie_id, Review.user_id == user_id)
+        .returning(Review.rating)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if deleted is None:
+        _raise_review_not_modifiable(db, user_id, movie_id, review_id, "delete")
     
-    db.delete(review)
+    remove_rating(db, movie_id, deleted.rating)
     db.commit()
-
+    mark_written(user_scope(user_id))
+    invalidate_movie_caches(movie_id)
@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, or_, tuple_, cast
+from sqlalchemy.dialects.postgresql import DOUBLE_PRECISION
+from app.models.movie import Movie
+from app.schemas.movie import MovieListView
+from app.services.movie_builder import MOVIE_ELEMENT_COLUMNS, build_movie_elements
+from app.utils.pagination import encode_cursor, decode_cursor
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+def search_movies(
+    db: Session,
+    query: str,
+    cursor: Optional[str] = None,
+    page_size: int = 6,
+    view: MovieListView = MovieListView.Full,
+) -> dict:
+    """Search movies by name, tagline, description and director."""
+    if db.bind.dialect.name == "postgresql":
+        rows, next_cursor = _search_fulltext(db, query, cursor, page_size)
+    else:
+        rows, next_cursor = _search_substring(db, query, cursor, page_size)
+    
+    return {
+        "movies": build_movie_elements(db, rows, view == MovieListView.Full),
+        "pageInfo": {"size": page_size, "nextCursor": next_cursor},
+    }
+
+
+def _search_fulltext(db: Session, query: str, cursor: Optional[str], page_size: int):
+    """Ranked search over the GIN-indexed search vector, paged by (rank, id)."""
+    ts_query = func.websearch_to_tsquery("russian", query).op("||")(
+        func.websearch_to_tsquery("english", query)
+    )
+    # ts_rank_cd returns real; cast so cursor values round-trip exactly
+    rank = cast(func.ts_rank_cd(Movie.search_vector, ts_query), DOUBLE_PRECISION).label("rank")
+    
+    movies_query = (
+        db.query(*MOVIE_ELEMENT_COLUMNS, rank)
+        .filter(Movie.search_vector.op("@@")(ts_query))
+        .order_by(rank.desc(), Movie.id.desc())
+    )
+    if cursor:
+        last_rank, last_id = decode_cursor(cursor, float, UUID)
+        movies_query = movies_query.filter(tuple_(rank, Movie.id) < tuple_(last_rank, last_id))
+    
+    # Fetch one extra row to find out whether there is a next page
+    rows = movies_query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].rank, rows[-1].id)
+    return rows, next_cursor
+
+
+def _search_substring(db: Session, query: str, cursor: Optional[str], page_size: int):
+    """Unranked case-insensitive substring search for databases without full-text search (SQLite)."""
+    pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    movies_query = (
+        db.query(*MOVIE_ELEMENT_COLUMNS, Movie.created_at)
+        .filter(or_(
+            Movie.name.ilike(pattern, escape="\\"),
+            Movie.tagline.ilike(pattern, escape="\\"),
+            Movie.description.ilike(pattern, escape="\\"),
+            Movie.director.ilike(pattern, escape="\\"),
+        ))
+        .order_by(Movie.created_at, Movie.id)
+    )
+    if cursor:
+        created_at, movie_id = decode_cursor(cursor, datetime, UUID)
+        movies_query = movies_query.filter(tuple_(Movie.created_at, Movie.id) > tuple_(created_at, movie_id))
+    
+    rows = movies_query.limit(page_size + 1).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
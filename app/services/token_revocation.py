@@ -0,0 +1,137 @@
+"""Revocation list of access tokens.
+
+Revoked token IDs (``jti``) are stored in ``revoked_tokens`` until the token
+would have expired anyway. Each worker keeps a Bloom filter of the live
+entries, so checking a token costs a few hashes and no query; only filter
+hits are confirmed against the table. A logout also revokes every access
+token the user was issued before it (``users.tokens_revoked_before``);
+each worker keeps the cutoffs that can still match a live token in memory.
+
+A background thread reloads both from the database every
+TOKEN_REVOCATION_REFRESH_SECONDS and deletes expired rows, revocations made
+by the worker itself apply immediately. A token revoked by another worker
+is therefore rejected here after at most one refresh interval.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional, Set
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.token import RevokedToken
+from app.models.user import User
+from app.utils.bloom import BloomFilter
+from app.utils.periodic import PeriodicTask
+
+
+class RevokedTokenFilter:
+    """Bloom filter of revoked token IDs with exact confirmation of hits."""
+
+    def __init__(self, session_factory: Callable[[], Session], capacity: int, error_rate: float):
+        self._session_factory = session_factory
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._filter = BloomFilter(capacity, error_rate)
+        # Exact answers for filter hits, until the next refresh
+        self._revoked: Dict[str, float] = {}
+        self._not_revoked: Set[str] = set()
+        # User ID -> time of the last logout, for logouts within the access token lifetime
+        self._revoked_before: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._refresher = PeriodicTask("token-revocation", self.refresh)
+        self.checks = 0
+        self.filter_hits = 0
+        self.confirmations = 0
+        self.refreshed_at: Optional[float] = None
+
+    def refresh(self) -> None:
+        """Rebuild the filter from the live rows and delete expired ones."""
+        now = datetime.now(timezone.utc)
+        # Older logouts precede the issue time of every token that has not expired
+        cutoff_horizon = now - timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        with self._session_factory() as db:
+            db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= now))
+            jtis = db.scalars(select(RevokedToken.jti).where(RevokedToken.expires_at > now)).all()
+            cutoffs = db.execute(
+                select(User.id, User.tokens_revoked_before).where(User.tokens_revoked_before > cutoff_horizon)
+            ).all()
+            db.commit()
+        
+        rebuilt = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate, jtis)
+        revoked_before = {str(user_id): revoked_at.timestamp() for user_id, revoked_at in cutoffs}
+        with self._lock:
+            # Logouts on this worker committed after the read above
+            for user_id, revoked_at in self._revoked_before.items():
+                if revoked_at > max(revoked_before.get(user_id, 0), cutoff_horizon.timestamp()):
+                    revoked_before[user_id] = revoked_at
+            self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now.timestamp()}
+            # Likewise tokens revoked here after the read, which is_revoked only finds through the filter
+            for jti in self._revoked:
+                rebuilt.add(jti)
+            self._filter = rebuilt
+            self._not_revoked = set()
+            self._revoked_before = revoked_before
+            self.refreshed_at = time.time()
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Register a token revoked by this worker."""
+        with self._lock:
+            self._filter.add(jti)
+            self._revoked[jti] = expires_at
+            self._not_revoked.discard(jti)
+
+    def revoke_issued_before(self, user_id: str, revoked_at: float) -> None:
+        """Register a logout on this worker: the user's tokens issued until ``revoked_at`` are revoked."""
+        with self._lock:
+            self._revoked_before[user_id] = max(revoked_at, self._revoked_before.get(user_id, 0))
+
+    def revoked_before(self, user_id: str) -> Optional[float]:
+        """Time of the user's last logout if it may still revoke live tokens."""
+        return self._revoked_before.get(user_id)
+
+    def is_revoked(self, jti: str) -> bool:
+        with self._lock:
+            self.checks += 1
+            if jti not in self._filter:
+                return False
+            self.filter_hits += 1
+            if jti in self._revoked:
+                return True
+            if jti in self._not_revoked:
+                return False
+        
+        # Filter hit (possibly a false positive) that is not known yet
+        with self._session_factory() as db:
+            expires_at = db.scalar(select(RevokedToken.expires_at).where(RevokedToken.jti == jti))
+        with self._lock:
+            self.confirmations += 1
+            if expires_at is None:
+                self._not_revoked.add(jti)
+                return False
+            self._revoked[jti] = expires_at.timestamp()
+            return True
+
+    def start(self, interval: float) -> None:
+        """Refresh the filter now and then every ``interval`` seconds in a daemon thread."""
+        self._refresher.start(interval)
+
+    def stop(self) -> None:
+        self._refresher.stop()
+
+    def stats(self) -> dict:
+        return {
+            "checks": self.checks,
+            "filterHits": self.filter_hits,
+            "confirmations": self.confirmations,
+            "logoutCutoffs": len(self._revoked_before),
+            "refreshedAt": self.refreshed_at,
+        }
+
+
+revoked_token_filter = RevokedTokenFilter(
+    SessionLocal,
+    settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+    settings.TOKEN_REVOCATION_FILTER_ERROR_RATE,
+)
@@ -1,16 +1,16 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from app.models.user import User
 from app.schemas.user import ProfileModel
-from app.core.exceptions import NotFoundException
+from app.core.exceptions import NotFoundException, ConflictException
+from app.services.review_service import touch_movies_reviewed_by, invalidate_movie_caches
+from app.services.read_routing import mark_written, user_scope
+from app.services.cache import principal_cache
+from app.utils.integrity import violated_constraint
 from uuid import UUID
 
 
-def get_user_profile(db: Session, user_id: UUID) -> ProfileModel:
-    """Get user profile."""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise NotFoundException("User not found")
-    
+def _profile_model(user: User) -> ProfileModel:
     return ProfileModel(
         id=user.id,
         nickName=user.username,
@@ -22,12 +22,33 @@ def get_user_profile(db: Session, user_id: UUID) -> ProfileModel:
     )
 
 
+def get_user_principal(db: Session, user_id: UUID) -> ProfileModel:
+    """Get the profile of an authenticated user, reading through the principal cache."""
+    def load() -> bytes:
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise NotFoundException("User not found")
+        return _profile_model(user).model_dump_json().encode()
+    
+    return ProfileModel.model_validate_json(principal_cache.get_or_load(str(user_id), load))
+
+
+def get_user_profile(db: Session, user_id: UUID) -> ProfileModel:
+    """Get user profile."""
+    return get_user_principal(db, user_id)
+
+
 def update_user_profile(db: Session, user_id: UUID, profile_data: ProfileModel) -> ProfileModel:
     """Update user profile."""
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise NotFoundException("User not found")
     
+    # Review authors (with avatars) are embedded in movie responses
+    touched_movie_ids = []
+    if user.avatar_link != profile_data.avatarLink:
+        touched_movie_ids = touch_movies_reviewed_by(db, user_id)
+    
     # Update fields
     user.email = profile_data.email
     user.avatar_link = profile_data.avatarLink
@@ -35,16 +56,18 @@ def update_user_profile(db: Session, user_id: UUID, profile_data: ProfileModel)
     user.birth_date = profile_data.birthDate
     user.gender = profile_data.gender
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as error:
+        db.rollback()
+        if violated_constraint(error) == "ix_users_email":
+            raise ConflictException("Email already registered")
+        raise
     db.refresh(user)
+    mark_written(user_scope(user_id))
+    principal_cache.invalidate(str(user_id))
+    if touched_movie_ids:
+        invalidate_movie_caches(*touched_movie_ids)
     
-    return ProfileModel(
-        id=user.id,
-        nickName=user.username,
-        email=user.email,
-        avatarLink=user.avatar_link,
-        name=user.name,
-        birthDate=user.birth_date,
-        gender=user.gender,
-    )
+    return _profile_model(user)
 
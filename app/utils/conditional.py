@@ -0,0 +1,59 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+from fastapi import Request
+
+
+def content_etag(content: bytes) -> str:
+    """Build a strong ETag from the exact bytes of a representation."""
+    return '"' + hashlib.sha1(content).hexdigest() + '"'
+
+
+def pack_document(document: bytes, last_modified: Optional[datetime] = None) -> bytes:
+    """Cache entry of a serialized document together with its validators.
+
+    The validators are computed when the document is built, so a cached
+    body is always served with the validators that describe it, whatever
+    the database state is by then.
+    """
+    stamp = last_modified.isoformat() if last_modified is not None else ""
+    return f"{content_etag(document)}\n{stamp}\n".encode() + document
+
+
+def unpack_document(entry: bytes) -> Tuple[bytes, str, Optional[datetime]]:
+    """Document, ETag and Last-Modified of a pack_document entry."""
+    etag, stamp, document = entry.split(b"\n", 2)
+    return document, etag.decode(), datetime.fromisoformat(stamp.decode()) if stamp else None
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None, private: bool = False) -> dict:
+    """Response headers carrying the validators; clients must revalidate.
+
+    ``private`` marks per-user representations that shared caches must not store.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache" if private else "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match / If-Modified-Since for a GET request."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have a one second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
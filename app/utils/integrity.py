@@ -0,0 +1,14 @@
+from typing import Optional
+from sqlalchemy.exc import IntegrityError
+
+
+def violated_constraint(error: IntegrityError) -> Optional[str]:
+    """Name of the constraint (or unique index) an IntegrityError reports.
+
+    psycopg2 exposes it on the error diagnostics, asyncpg on the original
+    exception that the SQLAlchemy adapter wraps.
+    """
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        return diag.constraint_name
+    return getattr(error.orig.__cause__, "constraint_name", None)
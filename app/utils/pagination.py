@@ -0,0 +1,38 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+from uuid import UUID
+from app.core.exceptions import BadRequestException
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque URL-safe cursor."""
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> List[Any]:
+    """Decode a cursor produced by encode_cursor into values of the given types."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(types):
+            raise ValueError("Unexpected cursor shape")
+        values = []
+        for value, value_type in zip(raw, types):
+            if value_type is datetime:
+                values.append(datetime.fromisoformat(value))
+            else:
+                values.append(value_type(value))
+        return values
+    except (ValueError, TypeError, AttributeError):
+        raise BadRequestException("Invalid cursor")
@@ -0,0 +1,43 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """Calls ``func`` now and then every ``interval`` seconds in a daemon thread.
+
+    Exceptions are logged and the next run happens on schedule.
+    """
+
+    def __init__(self, name: str, func: Callable[[], None]):
+        self.name = name
+        self._func = func
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def start(self, interval: float) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self._func()
+            except Exception:
+                logger.exception("Periodic task %s failed", self.name)
+            self._stop.wait(interval)
@@ -0,0 +1,90 @@
+"""Connection pool metrics.
+
+Live checked-out/idle/overflow counts are read from the pool itself, the
+time requests spend waiting for a connection is recorded by a pool subclass
+into a histogram with fixed buckets.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+# Upper bounds of the checkout wait histogram buckets, in milliseconds
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class PoolMetrics:
+    """Checkout counters and wait-time histogram of one engine's pool."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_sum_ms = 0.0
+        # One counter per bucket plus one for waits above the last bound
+        self.wait_buckets: List[int] = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    def observe(self, wait_ms: float, timed_out: bool = False) -> None:
+        bucket = len(WAIT_BUCKETS_MS)
+        for index, bound in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= bound:
+                bucket = index
+                break
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_sum_ms += wait_ms
+            self.wait_buckets[bucket] += 1
+
+    def stats(self, pool: Pool) -> Dict:
+        """Current pool state and checkout statistics."""
+        with self._lock:
+            buckets = list(self.wait_buckets)
+            checkouts, timeouts, wait_sum_ms = self.checkouts, self.timeouts, self.wait_sum_ms
+        
+        # Cumulative counts, as in Prometheus histograms
+        histogram = []
+        total = 0
+        for bound, count in zip(list(WAIT_BUCKETS_MS) + ["+Inf"], buckets):
+            total += count
+            histogram.append({"le": bound, "count": total})
+        
+        state = {"worker": os.getpid()}
+        if hasattr(pool, "checkedout"):
+            state.update(
+                size=pool.size(),
+                checkedOut=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+            )
+        state.update(
+            checkouts=checkouts,
+            timeouts=timeouts,
+            waitSumMs=round(wait_sum_ms, 3),
+            waitHistogramMs=histogram,
+        )
+        return state
+
+
+def instrumented_pool_class(pool_class: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Subclass of pool_class that records connection checkout waits into metrics.
+
+    Pools recreated by ``engine.dispose()`` keep the class, and so the metrics.
+    """
+
+    class InstrumentedPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                return super().connect()
+            except exc.TimeoutError:
+                timed_out = True
+                raise
+            finally:
+                metrics.observe((time.perf_counter() - start) * 1000, timed_out)
+
+    InstrumentedPool.__name__ = InstrumentedPool.__qualname__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
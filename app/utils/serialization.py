@@ -0,0 +1,23 @@
+from typing import Any
+from uuid import UUID
+from fastapi.responses import ORJSONResponse as _ORJSONResponse
+import orjson
+
+
+def _default(value: Any) -> Any:
+    # asyncpg returns its own UUID subclass, which orjson does not serialize natively
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize response content with orjson."""
+    return orjson.dumps(content, default=_default)
+
+
+class ORJSONResponse(_ORJSONResponse):
+    """ORJSONResponse that also serializes asyncpg values."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
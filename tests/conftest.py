@@ -0,0 +1,52 @@
+"""Fixtures for tests against the database configured by DATABASE_URL.
+
+Every test runs inside a transaction that is rolled back at the end, so the
+tests need a migrated database (``alembic upgrade head``) but leave no data
+behind. Tests are skipped when the database is not reachable.
+"""
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Tuple
+import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.database import engine
+
+
+@pytest.fixture
+def connection():
+    try:
+        connection = engine.connect()
+    except OperationalError as error:
+        pytest.skip(f"Database is not available: {error}")
+    transaction = connection.begin()
+    yield connection
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def db(connection) -> Iterator[Session]:
+    # Service commits release savepoints; everything is rolled back at the end
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def count_statements(connection):
+    """Context manager collecting the SQL statements executed inside it, with their parameters."""
+    @contextmanager
+    def counting() -> Iterator[List[Tuple[str, Any]]]:
+        statements: List[Tuple[str, Any]] = []
+        
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        
+        event.listen(connection, "before_cursor_execute", capture)
+        try:
+            yield statements
+        finally:
+            event.remove(connection, "before_cursor_execute", capture)
+    
+    return counting
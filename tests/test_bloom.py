@@ -0,0 +1,20 @@
+"""Bloom filter membership."""
+from uuid import uuid4
+from app.utils.bloom import BloomFilter
+
+
+def test_no_false_negatives():
+    items = [str(uuid4()) for _ in range(5000)]
+    bloom = BloomFilter(1000, 0.01, items)
+    assert all(item in bloom for item in items)
+
+
+def test_false_positive_rate_at_capacity():
+    bloom = BloomFilter(10000, 0.01, (str(uuid4()) for _ in range(10000)))
+    false_positives = sum(str(uuid4()) in bloom for _ in range(10000))
+    assert false_positives < 300
+
+
+def test_empty_filter_contains_nothing():
+    bloom = BloomFilter(0)
+    assert "jti" not in bloom
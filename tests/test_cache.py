@@ -0,0 +1,72 @@
+"""Versioned cache entries and the cache backends."""
+import asyncio
+import threading
+from sqlalchemy.util import greenlet_spawn
+from app.services.cache import Cache, MemoryCacheBackend, RedisCacheBackend
+
+
+def test_invalidate_makes_old_entries_unreachable():
+    cache = Cache(MemoryCacheBackend(), "test", ttl=60)
+    assert cache.get_or_load("key", lambda: b"old") == b"old"
+    assert cache.get_or_load("key", lambda: b"new") == b"old"
+    
+    cache.invalidate("key")
+    assert cache.get_or_load("key", lambda: b"new") == b"new"
+
+
+def test_counters_are_bounded():
+    backend = MemoryCacheBackend(max_entries=10)
+    for index in range(100):
+        backend.incr(f"counter-{index}")
+    assert len(backend._counters) == 10
+
+
+def test_evicted_counter_never_repeats_a_version():
+    backend = MemoryCacheBackend(max_entries=2)
+    used = {backend.get_counter("evicted"), backend.incr("evicted"), backend.incr("evicted")}
+    backend.incr("other-1")
+    backend.incr("other-2")
+    
+    assert "evicted" not in backend._counters
+    assert backend.get_counter("evicted") not in used
+    assert backend.incr("evicted") not in used
+
+
+class RecordingRedis:
+    """Redis client stand-in recording the threads it is called from."""
+
+    def __init__(self):
+        self.values = {}
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.threads.add(threading.get_ident())
+        self.values[key] = value
+
+    def incr(self, key):
+        self.threads.add(threading.get_ident())
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+def test_redis_round_trips_stay_off_the_event_loop():
+    client = RecordingRedis()
+    cache = Cache(RedisCacheBackend(client), "test", ttl=60)
+    
+    async def load():
+        return b"value"
+    
+    async def scenario():
+        assert await cache.get_or_load_async("key", load) == b"value"
+        assert await cache.get_or_load_async("key", load) == b"value"
+        # Services running through AsyncSession.run_sync call the sync API on the loop
+        await greenlet_spawn(cache.invalidate, "key")
+        assert await greenlet_spawn(cache.get_or_load, "key", lambda: b"new") == b"new"
+        return threading.get_ident()
+    
+    loop_thread = asyncio.run(scenario())
+    assert client.threads and loop_thread not in client.threads
@@ -0,0 +1,78 @@
+"""Pages of movies load in a fixed number of queries, however many reviews the movies have."""
+from typing import NamedTuple, List
+from uuid import UUID, uuid4
+import pytest
+from app.config import settings
+from app.models.favorite import FavoriteMovie
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.models.review import Review
+from app.models.user import User
+from app.schemas.movie import MovieFilters, MovieListView
+from app.services import favorite_service, movie_service
+
+MOVIES = 6
+
+
+class Catalog(NamedTuple):
+    genre_id: UUID
+    movie_ids: List[UUID]
+    user_id: UUID
+
+
+def create_catalog(db, reviews_per_movie: int) -> Catalog:
+    """Movies of a new genre, each reviewed by ``reviews_per_movie`` users and favorited by the first one."""
+    genre = Genre(name=f"genre-{uuid4().hex}")
+    movies = [
+        Movie(name=f"Movie {index}", poster="https://example.com/poster.png", year=2000 + index,
+              country="Testland", time=100, age_limit=12, genres=[genre])
+        for index in range(MOVIES)
+    ]
+    users = [
+        User(username=f"user-{uuid4().hex}", email=f"{uuid4().hex}@example.com", name="Reviewer",
+             password_hash="unused", gender=0)
+        for _ in range(reviews_per_movie)
+    ]
+    db.add_all(movies + users)
+    db.flush()
+    
+    db.add_all(
+        Review(movie_id=movie.id, user_id=user.id, rating=7, review_text="Review")
+        for movie in movies for user in users
+    )
+    db.add_all(FavoriteMovie(user_id=users[0].id, movie_id=movie.id) for movie in movies)
+    db.flush()
+    return Catalog(genre.id, [movie.id for movie in movies], users[0].id)
+
+
+def load_catalog_page(db, catalog: Catalog) -> List[dict]:
+    return movie_service.get_movies_paged(
+        db, 1, MOVIES, MovieListView.Full, MovieFilters(genreId=catalog.genre_id)
+    )["movies"]
+
+
+def load_movie_details(db, catalog: Catalog) -> List[dict]:
+    return [movie_service.get_movie_details(db, catalog.movie_ids[0])]
+
+
+def load_favorites(db, catalog: Catalog) -> List[dict]:
+    return favorite_service.get_favorite_movies(db, catalog.user_id)["movies"]
+
+
+@pytest.mark.parametrize("load", [load_catalog_page, load_movie_details, load_favorites])
+def test_query_count_does_not_grow_with_reviews(db, count_statements, load):
+    query_counts = []
+    for reviews_per_movie in (1, 20):
+        catalog = create_catalog(db, reviews_per_movie)
+        with count_statements() as statements:
+            movies = load(db, catalog)
+        
+        if load is load_movie_details:
+            # Details embed only the newest reviews
+            assert len(movies[0]["reviews"]) == min(reviews_per_movie, settings.MOVIE_DETAILS_REVIEWS_LIMIT)
+        else:
+            assert len(movies) == MOVIES
+            assert all(len(movie["reviews"]) == reviews_per_movie for movie in movies)
+        query_counts.append(len(statements))
+    
+    assert query_counts[0] == query_counts[1]
@@ -0,0 +1,160 @@
+"""The services' hot queries are served by indexes.
+
+Every statement a service call issues is explained with sequential scans
+disabled. A sequential scan that remains in such a plan means no index can
+serve the query, so it would scan the whole table once the table grows.
+"""
+import json
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.core.security import create_access_token
+from app.models.genre import Genre
+from app.models.movie import Movie
+from app.models.review import Review
+from app.schemas.auth import UserRegisterModel
+from app.schemas.movie import MovieFilters, MovieListView, MovieSort, SortOrder
+from app.schemas.review import ReviewModifyModel
+from app.services import auth_service, favorite_service, movie_service, review_service, search_service, user_service
+from app.services.token_revocation import revoked_token_filter
+from app.utils.pagination import encode_cursor
+
+# Tables that grow with users and content; small lookup tables (genres) may be scanned
+CHECKED_TABLES = {"movies", "movie_genres", "reviews", "favorite_movies", "users", "refresh_tokens", "revoked_tokens"}
+
+# Queries that read every row by design, e.g. aggregates over the whole catalog
+# (the page count and Last-Modified of the unfiltered catalog)
+ALLOWED_SCANS = {
+    "catalog page": {"movies"},
+}
+
+# Statements that plan no table access
+SKIPPED_PREFIXES = ("INSERT", "SAVEPOINT", "RELEASE", "ROLLBACK", "SET", "SELECT pg_")
+
+REVIEW = ReviewModifyModel(reviewText="Query plan check", rating=7)
+
+
+class Scene(NamedTuple):
+    db: Session
+    genre_id: UUID
+    movie_ids: List[UUID]
+    user_id: UUID
+    username: str
+    token: str
+
+    @property
+    def movie_id(self) -> UUID:
+        return self.movie_ids[0]
+
+    def review_id(self) -> UUID:
+        return self.db.scalar(select(Review.id).where(Review.user_id == self.user_id, Review.movie_id == self.movie_id))
+
+
+def create_scene(db: Session) -> Scene:
+    """A genre with three movies and a registered user."""
+    genre = Genre(name=f"genre-{uuid4().hex}")
+    movies = [
+        Movie(name=f"Movie {index}", poster="https://example.com/poster.png", year=2000 + index,
+              country="США", time=100, age_limit=12, genres=[genre])
+        for index in range(3)
+    ]
+    db.add_all(movies)
+    db.flush()
+    
+    username = f"plan-{uuid4().hex[:12]}"
+    user = UserRegisterModel(userName=username, name="Query Plan Check", password="unused",
+                             email=f"{username}@example.com", gender=0)
+    auth_service.create_user(db, user, "unused")
+    user_id = auth_service.get_login_user(db, username).id
+    return Scene(db, genre.id, [movie.id for movie in movies], user_id, username,
+                 create_access_token({"sub": str(user_id)}))
+
+
+def filters(scene: Scene) -> MovieFilters:
+    return MovieFilters(genreId=scene.genre_id, yearFrom=1990, country="США", sort=MovieSort.Rating, order=SortOrder.Desc)
+
+
+def add_review(scene: Scene):
+    return review_service.add_review(scene.db, scene.user_id, scene.movie_id, REVIEW)
+
+
+def add_favorite(scene: Scene):
+    return favorite_service.add_favorite_movie(scene.db, scene.user_id, scene.movie_id)
+
+
+def update_profile(scene: Scene):
+    profile = user_service.get_user_profile(scene.db, scene.user_id)
+    return user_service.update_user_profile(
+        scene.db, scene.user_id, profile.model_copy(update={"avatarLink": "https://example.com/a.png"})
+    )
+
+
+# Name -> (setup, service call); only the statements of the service call are explained
+SCENARIOS: Dict[str, Tuple[Optional[Callable[[Scene], object]], Callable[[Scene], object]]] = {
+    "catalog page": (None, lambda s: movie_service.get_movies_paged(s.db, 2, 6, MovieListView.Full)),
+    "catalog page, filtered": (None, lambda s: movie_service.get_movies_paged(s.db, 1, 6, MovieListView.Full, filters(s))),
+    "catalog cursor": (None, lambda s: movie_service.get_movies_by_cursor(s.db, None, 6, MovieListView.Full)),
+    "catalog cursor, filtered": (
+        None, lambda s: movie_service.get_movies_by_cursor(s.db, None, 6, MovieListView.Summary, filters(s)),
+    ),
+    "movie details": (None, lambda s: movie_service._load_movie_details(s.db, s.movie_id)),
+    "movie details batch": (None, lambda s: movie_service._load_movie_details_batch(s.db, s.movie_ids)),
+    "search": (None, lambda s: search_service.search_movies(s.db, "фильм")),
+    "movie reviews": (None, lambda s: review_service.get_movie_reviews(s.db, s.movie_id)),
+    "add review": (None, add_review),
+    "edit review": (add_review, lambda s: review_service.edit_review(s.db, s.user_id, s.movie_id, s.review_id(), REVIEW)),
+    "update profile": (add_review, update_profile),
+    "delete review": (add_review, lambda s: review_service.delete_review(s.db, s.user_id, s.movie_id, s.review_id())),
+    "add favorite": (None, add_favorite),
+    "favorite flags": (add_favorite, lambda s: favorite_service.get_favorite_ids(s.db, s.user_id, s.movie_ids)),
+    "favorites": (add_favorite, lambda s: favorite_service.get_favorite_movies(s.db, s.user_id)),
+    "favorites, next page": (add_favorite, lambda s: favorite_service.get_favorite_movies(
+        s.db, s.user_id, encode_cursor(datetime.now(timezone.utc), s.movie_id),
+    )),
+    "remove favorite": (add_favorite, lambda s: favorite_service.remove_favorite_movie(s.db, s.user_id, s.movie_id)),
+    "login": (None, lambda s: auth_service.issue_login_tokens(s.db, auth_service.get_login_user(s.db, s.username))),
+    "principal": (None, lambda s: user_service.get_user_principal(s.db, s.user_id)),
+    "logout": (None, lambda s: auth_service.logout_user(s.db, s.user_id, s.token)),
+    "purge refresh tokens": (None, lambda s: auth_service.purge_expired_refresh_tokens(s.db, 1000)),
+    "refresh revoked tokens": (None, lambda s: revoked_token_filter.refresh()),
+}
+
+
+def seq_scans(plan: dict) -> Iterator[str]:
+    if plan["Node Type"] == "Seq Scan" and plan["Relation Name"] in CHECKED_TABLES:
+        yield plan["Relation Name"]
+    for child in plan.get("Plans", []):
+        yield from seq_scans(child)
+
+
+@pytest.mark.parametrize("name", SCENARIOS)
+def test_hot_queries_use_indexes(name, connection, db, count_statements, monkeypatch):
+    # The revocation refresh opens its own session; point it at the test transaction
+    monkeypatch.setattr(
+        revoked_token_filter, "_session_factory",
+        lambda: Session(bind=connection, join_transaction_mode="create_savepoint"),
+    )
+    setup, run = SCENARIOS[name]
+    scene = create_scene(db)
+    if setup is not None:
+        setup(scene)
+    with count_statements() as statements:
+        run(scene)
+    
+    cursor = connection.connection.cursor()
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    scans = []
+    for statement, parameters in statements:
+        if statement.lstrip().upper().startswith(SKIPPED_PREFIXES):
+            continue
+        cursor.execute("EXPLAIN (FORMAT JSON) " + statement, parameters)
+        plan = cursor.fetchone()[0]
+        plan = json.loads(plan) if isinstance(plan, str) else plan
+        scans.extend(
+            f"sequential scan on {table}: {' '.join(statement.split())[:300]}"
+            for table in seq_scans(plan[0]["Plan"]) if table not in ALLOWED_SCANS.get(name, ())
+        )
+    assert not scans, "\n".join(scans)
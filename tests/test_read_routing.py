@@ -0,0 +1,30 @@
+"""Read-your-own-writes marks."""
+import time
+from app.services.read_routing import ExpiringMarks
+
+
+def test_marks_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    marks = ExpiringMarks(ttl=5)
+    marks.add("a")
+    assert "a" in marks
+    
+    now[0] += 5
+    assert "a" not in marks
+
+
+def test_marks_are_pruned_once_expired_and_never_evicted_before(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    marks = ExpiringMarks(ttl=5)
+    for index in range(10000):
+        marks.add(f"key-{index}")
+    assert all(f"key-{index}" in marks for index in range(10000))
+    
+    now[0] += 3
+    marks.add("key-0")
+    now[0] += 3
+    marks.add("late")
+    assert len(marks._expires) == 2
+    assert "key-0" in marks and "late" in marks
@@ -0,0 +1,102 @@
+"""Concurrent calls for the same key share one execution."""
+import asyncio
+import threading
+import time
+import pytest
+from app.services.cache import AsyncSingleFlight, SingleFlight
+
+
+def test_single_flight_shares_one_call():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+    
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait()
+        return b"value"
+    
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", fn)))
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", fn))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    # Let the followers reach the wait on the leader's call
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert sorted(results) == [(b"value", False)] + [(b"value", True)] * 3
+    assert flight._calls == {}
+
+
+def test_single_flight_shares_the_error():
+    flight = SingleFlight()
+    
+    def fn():
+        raise ValueError("failed")
+    
+    with pytest.raises(ValueError):
+        flight.do("key", fn)
+    assert flight.do("key", lambda: b"value") == (b"value", False)
+
+
+def test_async_single_flight_shares_one_call():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+        
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return b"value"
+        
+        results = await asyncio.gather(*(flight.do("key", fn) for _ in range(4)))
+        return calls, results, flight
+    
+    calls, results, flight = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert results == [(b"value", False)] + [(b"value", True)] * 3
+    assert flight._calls == {}
+
+
+def test_async_single_flight_shares_the_error():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        
+        async def fn():
+            await asyncio.sleep(0.01)
+            raise ValueError("failed")
+        
+        return await asyncio.gather(*(flight.do("key", fn) for _ in range(3)), return_exceptions=True)
+    
+    assert all(isinstance(result, ValueError) for result in asyncio.run(scenario()))
+
+
+def test_async_followers_take_over_from_a_cancelled_leader():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+        
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return b"value"
+        
+        leader = asyncio.create_task(flight.do("key", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("key", fn)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        
+        results = await asyncio.gather(*followers)
+        return calls, results, leader
+    
+    calls, results, leader = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert len(calls) == 2
+    assert sorted(results) == [(b"value", False)] + [(b"value", True)] * 2
@@ -0,0 +1,129 @@
+"""Revoked token filter against a fake database session."""
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+from sqlalchemy.sql import Delete
+from app.services.token_revocation import RevokedTokenFilter
+
+
+class Rows(list):
+    def all(self):
+        return list(self)
+
+
+class FakeSession:
+    """Answers the queries of RevokedTokenFilter from a dict of jti -> expiry."""
+
+    def __init__(self, revoked: Dict[str, datetime], on_commit: Optional[Callable[[], None]]):
+        self.revoked = revoked
+        self.on_commit = on_commit
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        if isinstance(statement, Delete):
+            return None
+        # Logout cutoffs
+        return Rows()
+
+    def scalars(self, statement):
+        now = datetime.now(timezone.utc)
+        return Rows(jti for jti, expires_at in self.revoked.items() if expires_at > now)
+
+    def scalar(self, statement):
+        jti, = statement.compile().params.values()
+        return self.revoked.get(jti)
+
+    def commit(self):
+        if self.on_commit is not None:
+            self.on_commit()
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.revoked: Dict[str, datetime] = {}
+        self.on_commit: Optional[Callable[[], None]] = None
+        self.queries = 0
+
+    def revoke(self, jti: str) -> float:
+        expires_at = datetime.now(timezone.utc) + timedelta(minutes=30)
+        self.revoked[jti] = expires_at
+        return expires_at.timestamp()
+
+    def session(self) -> FakeSession:
+        self.queries += 1
+        return FakeSession(self.revoked, self.on_commit)
+
+
+def create_filter(database: FakeDatabase) -> RevokedTokenFilter:
+    return RevokedTokenFilter(database.session, capacity=1000, error_rate=0.01)
+
+
+def test_revoked_tokens_are_never_missed():
+    database = FakeDatabase()
+    jtis = [str(uuid4()) for _ in range(3000)]
+    for jti in jtis:
+        database.revoke(jti)
+    revoked = create_filter(database)
+    revoked.refresh()
+    
+    assert all(revoked.is_revoked(jti) for jti in jtis)
+
+
+def test_live_tokens_are_confirmed_against_the_database():
+    database = FakeDatabase()
+    for _ in range(1000):
+        database.revoke(str(uuid4()))
+    revoked = create_filter(database)
+    revoked.refresh()
+    
+    live = [str(uuid4()) for _ in range(1000)]
+    assert not any(revoked.is_revoked(jti) for jti in live)
+    assert revoked.confirmations == revoked.filter_hits < 100
+    # Known false positives are not confirmed twice
+    assert not any(revoked.is_revoked(jti) for jti in live)
+    assert revoked.confirmations == revoked.filter_hits / 2
+
+
+def test_tokens_revoked_locally_are_revoked_without_a_refresh():
+    database = FakeDatabase()
+    revoked = create_filter(database)
+    revoked.refresh()
+    queries = database.queries
+    
+    jti = str(uuid4())
+    revoked.add(jti, database.revoke(jti))
+    assert revoked.is_revoked(jti)
+    assert database.queries == queries
+
+
+def test_tokens_revoked_during_a_refresh_survive_the_rebuild():
+    database = FakeDatabase()
+    revoked = create_filter(database)
+    jti = str(uuid4())
+    
+    def revoke_after_the_read():
+        # Another request logs out between the refresh's read and its swap
+        revoked.add(jti, database.revoke(jti))
+        database.on_commit = None
+    
+    database.on_commit = revoke_after_the_read
+    revoked.refresh()
+    
+    assert jti in revoked._filter
+    assert revoked.is_revoked(jti)
+
+
+def test_expired_local_revocations_are_dropped_on_refresh():
+    database = FakeDatabase()
+    revoked = create_filter(database)
+    revoked.add("expired", time.time() - 1)
+    revoked.refresh()
+    
+    assert "expired" not in revoked._revoked
+    assert not revoked.is_revoked("expired")